@@ -0,0 +1,63 @@
+"""Schedule build time per term, run with `python -m benchmarks.aggregation`.
+
+Builds the Month chain and aggregates it into Year/Quarter objects. With
+linear scaling the cost per month stays flat from 5 to 40 years.
+"""
+
+import math
+import time
+from datetime import datetime
+
+from src.repayment.core import Month, Repayment
+
+
+TERMS = (5, 10, 20, 30, 40)
+ROUNDS = 20
+INTEREST_RATE = 0.04
+INITIAL_BALANCE = -250000.0
+
+
+def annuity(years: int) -> float:
+    rate = INTEREST_RATE / 12
+    return (
+        math.ceil(-INITIAL_BALANCE * rate / (1 - (1 + rate) ** (-12 * years)) * 100)
+        / 100
+    )
+
+
+def build(years: int) -> tuple[int, float]:
+    repayment = Repayment(
+        interest_rate=INTEREST_RATE,
+        monthly_installment=annuity(years),
+        initial_balance=INITIAL_BALANCE,
+        start_date=datetime(2024, 1, 1),
+    )
+    start = time.perf_counter()
+    current_month = Month(
+        monthly_interest_rate=repayment.interest_rate / 12,
+        next_installment=repayment.monthly_installment,
+        date=repayment.start_date,
+        balance=repayment.initial_balance,
+    )
+    months = 0
+    while current_month:
+        repayment.add_month(current_month)
+        current_month = current_month.create_next_month()
+        months += 1
+    return months, time.perf_counter() - start
+
+
+def main():
+    print(f"{'years':>5} {'months':>6} {'total ms':>9} {'us/month':>9}")
+    per_month = []
+    for years in TERMS:
+        months, elapsed = min(build(years) for _ in range(ROUNDS))
+        per_month.append(elapsed / months)
+        print(
+            f"{years:>5} {months:>6} {elapsed * 1e3:>9.2f} {per_month[-1] * 1e6:>9.2f}"
+        )
+    print(f"40y/5y cost per month: {per_month[-1] / per_month[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
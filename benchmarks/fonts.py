@@ -0,0 +1,62 @@
+"""Per-document font overhead, run with `python -m benchmarks.fonts`.
+
+cold: the font cache is cleared before every document, so each PDF parses
+      Roboto-Regular.ttf and Roboto-Bold.ttf again (the cost before the cache)
+warm: the fonts are parsed once by preload_fonts and cloned per document
+"""
+
+import io
+import time
+from datetime import datetime
+
+from src.repayment.core import Repayment
+from src.repayment.report import (
+    DEFAULT_CURRENCY,
+    PDF,
+    clear_font_cache,
+    preload_fonts,
+)
+
+
+FONTS = "src/repayment/fonts"
+ROUNDS = 20
+
+
+def measure(render, cold: bool) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        if cold:
+            clear_font_cache()
+        else:
+            preload_fonts(FONTS)
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    repayment = Repayment(
+        interest_rate=0.0345,
+        monthly_installment=450.0,
+        initial_balance=-5000.0,
+        start_date=datetime(2024, 8, 1),
+    )
+    repayment.generate_schedule()
+    cases = {
+        "PDF() constructor": lambda: PDF(
+            language="EN", fonts_path=FONTS, currency=DEFAULT_CURRENCY
+        ),
+        "one page document": lambda: PDF.generate_repayment(
+            repayment, io.BytesIO(), fonts_path=FONTS
+        ),
+    }
+
+    print(f"{'':>18} {'cold ms':>8} {'warm ms':>8}")
+    for name, render in cases.items():
+        cold, warm = measure(render, cold=True), measure(render, cold=False)
+        print(f"{name:>18} {cold * 1e3:>8.2f} {warm * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Import time budget, run with `python -m benchmarks.startup`.
+
+Every module is imported in a fresh interpreter with `python -X importtime`;
+the cumulative time of the best of --rounds runs is compared to its budget.
+The scheduler and the CLI must also start without loading the heavy
+dependencies, those are imported by the features that need them. Exits with
+status 1 when a budget is exceeded or a heavy dependency was loaded.
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+HEAVY = ("numpy", "fpdf", "fontTools", "dateutil", "asyncio")
+# module: budget in ms
+BUDGETS = {
+    "src.repayment.core": 75.0,
+    "src.repayment.cli": 100.0,
+}
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    # Cumulative import time in ms and the heavy packages that were loaded
+    code = (
+        f"import sys, {module}\n"
+        f"print(*sorted({{m.split('.')[0] for m in sys.modules}} & {set(HEAVY)!r}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e3, result.stdout.split()
+    raise ValueError(f"{module} was not imported")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="multiplies every budget, e.g. for slow CI",
+    )
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'module':>20} {'ms':>8} {'budget':>8}  loaded")
+    for module, budget in BUDGETS.items():
+        runs = [measure(module) for _ in range(args.rounds)]
+        elapsed = min(ms for ms, _ in runs)
+        loaded = sorted({name for _, names in runs for name in names})
+        budget *= args.scale
+        over = elapsed > budget or bool(loaded)
+        failed |= over
+        print(
+            f"{module:>20} {elapsed:>8.1f} {budget:>8.1f}  "
+            f"{', '.join(loaded) or '-'}{'  FAIL' if over else ''}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
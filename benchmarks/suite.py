@@ -0,0 +1,217 @@
+"""Stage benchmarks, run with `python -m benchmarks.suite [--output FILE]`.
+
+Times every stage separately and records its peak traced memory:
+
+month_chain  Month.create_next_month from the start month to the payoff
+aggregation  Repayment.add_month of an existing chain into Year/Quarter
+irr          Repayment.calculate_effective_interest_rate
+pivot        Transaction.pivot rollups of every quarter and year
+pdf          PDF.generate_repayment into memory
+batch        RepaymentBatch.generate, 20-year loans, per batch size
+
+Use --output to save the results as JSON and --compare to print the ratios
+against an earlier file, e.g. one saved from the previous release.
+"""
+
+import argparse
+import io
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from src.repayment.batch import RepaymentBatch
+from src.repayment.core import Month, Repayment
+from src.repayment.report import PDF, preload_fonts
+
+
+FONTS = "src/repayment/fonts"
+TERMS = (1, 5, 10, 20, 30, 50)
+BATCH_SIZES = (100, 1_000, 10_000, 100_000)
+QUICK_TERMS = (1, 10, 30)
+QUICK_BATCH_SIZES = (100, 1_000)
+ROUNDS = 5
+INTEREST_RATE = 0.04
+INITIAL_BALANCE = -250000.0
+
+
+def annuity(years: int, balance: float = INITIAL_BALANCE) -> float:
+    rate = INTEREST_RATE / 12
+    return math.ceil(-balance * rate / (1 - (1 + rate) ** (-12 * years)) * 100) / 100
+
+
+def loan(years: int) -> Repayment:
+    return Repayment(
+        interest_rate=INTEREST_RATE,
+        monthly_installment=annuity(years),
+        initial_balance=INITIAL_BALANCE,
+        start_date=datetime(2024, 1, 1),
+    )
+
+
+def chain(repayment: Repayment) -> list[Month]:
+    months = []
+    current_month = Month(
+        monthly_interest_rate=repayment.interest_rate / 12,
+        next_installment=repayment.monthly_installment,
+        date=repayment.start_date,
+        balance=repayment.initial_balance,
+    )
+    while current_month:
+        months.append(current_month)
+        current_month = current_month.create_next_month()
+    return months
+
+
+def aggregate(months: list[Month]) -> Repayment:
+    repayment = loan(1)
+    for month in months:
+        repayment.add_month(month)
+    return repayment
+
+
+def scheduled(years: int) -> Repayment:
+    repayment = loan(years)
+    repayment.generate_schedule()
+    return repayment
+
+
+def pivot_all(repayment: Repayment):
+    for year in repayment.years:
+        for quarter in year.quarter_list:
+            quarter.pivot()
+        year.pivot()
+    repayment.pivot()
+
+
+def batch(size: int) -> RepaymentBatch:
+    rng = np.random.default_rng(size)
+    balance = -rng.uniform(10_000, 500_000, size).round(2)
+    rate = INTEREST_RATE / 12
+    return RepaymentBatch(
+        interest_rate=np.full(size, INTEREST_RATE),
+        monthly_installment=np.ceil(-balance * rate / (1 - (1 + rate) ** -240) * 100)
+        / 100,
+        initial_balance=balance,
+        start_date=np.full(size, np.datetime64("2024-01-01", "us")),
+    )
+
+
+# stage -> (setup(parameter), run(state)); only run is measured
+STAGES = {
+    "month_chain": (loan, chain),
+    "aggregation": (lambda years: chain(loan(years)), aggregate),
+    "irr": (scheduled, Repayment.calculate_effective_interest_rate),
+    "pivot": (scheduled, pivot_all),
+    "pdf": (
+        scheduled,
+        lambda repayment: PDF.generate_repayment(
+            repayment, io.BytesIO(), fonts_path=FONTS
+        ),
+    ),
+    "batch": (batch, RepaymentBatch.generate),
+}
+
+
+def measure(setup, run, parameter, rounds: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(rounds):
+        state = setup(parameter)
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+
+    state = setup(parameter)
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def run_suite(stages, terms, batch_sizes, rounds: int) -> list[dict]:
+    preload_fonts(FONTS)
+    results = []
+    print(f"{'stage':>12} {'param':>7} {'ms':>10} {'peak KiB':>10}")
+    for stage in stages:
+        setup, run = STAGES[stage]
+        for parameter in batch_sizes if stage == "batch" else terms:
+            seconds, peak = measure(setup, run, parameter, rounds)
+            key = "batch_size" if stage == "batch" else "years"
+            results.append(
+                {"stage": stage, key: parameter, "seconds": seconds, "peak_bytes": peak}
+            )
+            print(
+                f"{stage:>12} {parameter:>7} {seconds * 1e3:>10.3f} {peak / 1024:>10.1f}"
+            )
+    return results
+
+
+def compare(results: list[dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    identity = lambda row: (row["stage"], row.get("years"), row.get("batch_size"))
+    previous = {identity(row): row for row in baseline["results"]}
+    print(f"\nagainst {baseline_path} ({baseline['meta'].get('commit') or 'unknown'})")
+    print(f"{'stage':>12} {'param':>7} {'time':>8} {'memory':>8}")
+    for row in results:
+        old = previous.get(identity(row))
+        if old is None:
+            continue
+        parameter = row.get("years", row.get("batch_size"))
+        time_ratio = row["seconds"] / old["seconds"]
+        memory_ratio = row["peak_bytes"] / max(old["peak_bytes"], 1)
+        print(
+            f"{row['stage']:>12} {parameter:>7} {time_ratio:>7.2f}x {memory_ratio:>7.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(STAGES), default=list(STAGES)
+    )
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer terms, batches up to 1k"
+    )
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    terms, batch_sizes = (
+        (QUICK_TERMS, QUICK_BATCH_SIZES) if args.quick else (TERMS, BATCH_SIZES)
+    )
+    results = run_suite(args.stages, terms, batch_sizes, args.rounds)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
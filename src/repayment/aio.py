@@ -0,0 +1,104 @@
+import asyncio
+import io
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+
+from .core import Repayment
+from .parallel import init_worker, loan_parameters
+from .report import DEFAULT_CURRENCY, DEFAULT_FONTS_PATH, DEFAULT_LANGUAGE, PDF
+
+
+def schedule_worker(loan: dict, engine: str) -> Repayment:
+    repayment = Repayment(**loan)
+    if repayment.schedule is None:
+        repayment.generate_schedule(engine=engine)
+    return repayment
+
+
+def pdf_worker(
+    loan: dict,
+    output: str | None,
+    language: str,
+    currency: tuple[str, ...],
+    fonts_path: str,
+) -> str | bytes:
+    repayment = Repayment(**loan)
+    if output is not None:
+        PDF.stream_repayment(repayment, output, language, currency, fonts_path)
+        return output
+    buffer = io.BytesIO()
+    PDF.stream_repayment(repayment, buffer, language, currency, fonts_path)
+    return buffer.getvalue()
+
+
+@dataclass
+class AsyncExecutor:
+    # CPU work runs in a process pool. The semaphore admits at most
+    # max_concurrency jobs into the pool, the rest wait on the event loop where
+    # cancelling them is free; a job already running in a worker finishes
+    # there and its result is dropped.
+    workers: int | None = None
+    max_concurrency: int | None = None
+    fonts_path: str = DEFAULT_FONTS_PATH
+    executor: Executor | None = field(default=None, repr=False)
+    semaphores: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self.workers = self.workers or os.cpu_count() or 1
+        self.max_concurrency = self.max_concurrency or self.workers
+
+    def pool(self) -> Executor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.fonts_path,),
+            )
+        return self.executor
+
+    def semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop not in self.semaphores:
+            self.semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self.semaphores[loop]
+
+    async def run(self, function, *args):
+        async with self.semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool(), partial(function, *args))
+
+    def shutdown(self, wait: bool = True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
+        self.semaphores.clear()
+
+
+DEFAULT_EXECUTOR = AsyncExecutor()
+
+
+async def generate_schedule_async(
+    repayment: Repayment,
+    engine: str = "numpy",
+    executor: AsyncExecutor | None = None,
+) -> Repayment:
+    executor = executor or DEFAULT_EXECUTOR
+    return await executor.run(schedule_worker, loan_parameters(repayment), engine)
+
+
+async def render_pdf_async(
+    repayment: Repayment,
+    output: str | None = None,
+    language=DEFAULT_LANGUAGE,
+    currency=DEFAULT_CURRENCY,
+    fonts_path=DEFAULT_FONTS_PATH,
+    executor: AsyncExecutor | None = None,
+) -> str | bytes:
+    # Returns the PDF as bytes when no output path is given
+    executor = executor or DEFAULT_EXECUTOR
+    return await executor.run(
+        pdf_worker, loan_parameters(repayment), output, language, currency, fonts_path
+    )
@@ -0,0 +1,179 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .calendars import DEFAULT_CALENDAR, CalendarRule
+from .cents import MONTHLY_SCALE, check_rounding, divide, scale_rate, to_cents
+from .engine import Schedule, round_cents
+from .irr import effective_interest_rate
+
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+@dataclass
+class BatchResult:
+    monthly_installment: np.ndarray
+    term: np.ndarray
+    payoff_date: np.ndarray
+    total_principal: np.ndarray
+    total_interest: np.ndarray
+    total_installment: np.ndarray
+    effective_interest_rate: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.term)
+
+
+@dataclass
+class RepaymentBatch:
+    interest_rate: np.ndarray
+    monthly_installment: np.ndarray
+    initial_balance: np.ndarray
+    start_date: np.ndarray
+    max_interest_installment_ratio: float = 0.90
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    max_months: int | None = None
+    calendar: CalendarRule = DEFAULT_CALENDAR
+    # "half-even"/"half-up" amortize in int64 cents, None keeps float cents
+    rounding: str | None = None
+    adjusted: np.ndarray = field(init=False, repr=False)
+    cents: tuple[np.ndarray, ...] | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.interest_rate = np.asarray(self.interest_rate, dtype=np.float64)
+        self.initial_balance = np.asarray(self.initial_balance, dtype=np.float64)
+        self.start_date = np.asarray(self.start_date, dtype="datetime64[us]")
+        installment = np.asarray(self.monthly_installment, dtype=np.float64)
+
+        # Same adjustment as Repayment.__post_init__, applied column-wise
+        monthly_interest = self.interest_rate * -self.initial_balance / 12
+        interest_installment_ratio = monthly_interest / installment
+        self.adjusted = interest_installment_ratio > self.max_interest_installment_ratio
+        self.monthly_installment = np.where(
+            self.adjusted,
+            np.round((1.0 + monthly_interest) / self.max_interest_installment_ratio),
+            installment,
+        )
+        if self.rounding is not None:
+            check_rounding(self.rounding)
+            rounding = self.rounding
+            self.cents = (
+                np.array([scale_rate(rate) for rate in self.interest_rate.tolist()]),
+                np.array(
+                    [to_cents(x, rounding) for x in self.monthly_installment.tolist()]
+                ),
+                np.array(
+                    [to_cents(x, rounding) for x in self.initial_balance.tolist()]
+                ),
+            )
+
+    def __len__(self) -> int:
+        return len(self.initial_balance)
+
+    def amortize(self, start: int, stop: int):
+        # Installments of loans[start:stop] as one 2-D array, column 0 is the
+        # month 0 row and loans that pay off early are padded with zeros
+        monthly_interest_rate = self.interest_rate[start:stop] / 12
+        installment = self.monthly_installment[start:stop]
+        balance = round_cents(self.initial_balance[start:stop])
+        total_principal = np.zeros(len(balance))
+        total_interest = np.zeros(len(balance))
+        columns = [np.zeros(len(balance))]
+        while balance.any():
+            if self.max_months is not None and len(columns) > self.max_months:
+                raise ValueError(f"Loans not paid off within {self.max_months} months")
+            interest = round_cents(np.abs(balance) * monthly_interest_rate)
+            payoff = np.abs(balance) + interest <= installment
+            principal = np.where(
+                payoff, -balance, np.maximum(0.0, installment - interest)
+            )
+            next_balance = np.where(payoff, 0.0, round_cents(balance + principal))
+            if (next_balance == balance)[balance != 0].any():
+                raise ValueError("Monthly installment does not cover the interest")
+            columns.append(round_cents(interest + principal))
+            total_principal += round_cents(principal)
+            total_interest += interest
+            balance = next_balance
+        return np.column_stack(columns), total_principal, total_interest
+
+    def amortize_cents(self, start: int, stop: int):
+        # amortize() on int64 cents, exact up to the rounded interest division
+        rate, installment, balance = (values[start:stop] for values in self.cents)
+        total_interest = np.zeros(len(balance), dtype=np.int64)
+        total_principal = -balance
+        columns = [np.zeros(len(balance), dtype=np.int64)]
+        while balance.any():
+            if self.max_months is not None and len(columns) > self.max_months:
+                raise ValueError(f"Loans not paid off within {self.max_months} months")
+            interest = divide(-balance * rate, MONTHLY_SCALE, self.rounding)
+            payoff = -balance + interest <= installment
+            principal = np.where(payoff, -balance, installment - interest)
+            if (principal <= 0)[balance != 0].any():
+                raise ValueError("Monthly installment does not cover the interest")
+            columns.append(interest + principal)
+            total_interest += interest
+            balance = balance + principal
+        return (
+            np.column_stack(columns) / 100,
+            total_principal / 100,
+            total_interest / 100,
+        )
+
+    def generate(self) -> BatchResult:
+        count = len(self)
+        term = np.zeros(count, dtype=np.int64)
+        total_principal = np.zeros(count)
+        total_interest = np.zeros(count)
+        total_installment = np.zeros(count)
+        effective_rate = np.zeros(count)
+        for start in range(0, count, self.chunk_size):
+            stop = min(start + self.chunk_size, count)
+            amortize = self.amortize if self.rounding is None else self.amortize_cents
+            flows, principal, interest = amortize(start, stop)
+            term[start:stop] = np.count_nonzero(flows, axis=1)
+            total_principal[start:stop] = round_cents(principal)
+            total_interest[start:stop] = round_cents(interest)
+            total_installment[start:stop] = round_cents(flows.sum(axis=1))
+            effective_rate[start:stop] = effective_interest_rate(
+                np.column_stack((self.initial_balance[start:stop], flows)),
+                self.interest_rate[start:stop],
+            )
+
+        return BatchResult(
+            monthly_installment=self.monthly_installment,
+            term=term,
+            payoff_date=self.calendar.dates(self.start_date, term),
+            total_principal=total_principal,
+            total_interest=total_interest,
+            total_installment=total_installment,
+            effective_interest_rate=effective_rate,
+        )
+
+
+def summarize_schedules(
+    schedules: list[Schedule],
+    interest_rate: np.ndarray,
+    monthly_installment: np.ndarray,
+    initial_balance: np.ndarray,
+) -> BatchResult:
+    # BatchResult of schedules that already exist, without amortizing again:
+    # the installments are padded into one 2-D array like RepaymentBatch.amortize
+    term = np.array([len(schedule) - 1 for schedule in schedules], dtype=np.int64)
+    flows = np.zeros((len(schedules), int(term.max(initial=0)) + 1))
+    for row, schedule in enumerate(schedules):
+        flows[row, : len(schedule)] = schedule.installment
+    return BatchResult(
+        monthly_installment=np.asarray(monthly_installment, dtype=np.float64),
+        term=term,
+        payoff_date=np.array([schedule.date[-1] for schedule in schedules]),
+        total_principal=round_cents(
+            [schedule.principal.sum() for schedule in schedules]
+        ),
+        total_interest=round_cents([schedule.interest.sum() for schedule in schedules]),
+        total_installment=round_cents(flows.sum(axis=1)),
+        effective_interest_rate=effective_interest_rate(
+            np.column_stack((np.asarray(initial_balance, dtype=np.float64), flows)),
+            np.asarray(interest_rate, dtype=np.float64),
+        ),
+    )
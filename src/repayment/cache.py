@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from .core import Repayment
+from .engine import Schedule
+
+
+DEFAULT_MAXSIZE = 1024
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    max_bytes: int | None
+    currsize: int
+    nbytes: int
+
+
+def loan_key(repayment: Repayment) -> tuple:
+    # monthly_installment is already clamped by Repayment.__post_init__,
+    # calendar rules are frozen dataclasses and hash by value
+    return (
+        float(repayment.interest_rate),
+        float(repayment.monthly_installment),
+        round(float(repayment.initial_balance), 2),
+        repayment.start_date,
+        repayment.calendar,
+    )
+
+
+@dataclass
+class ScheduleCache:
+    maxsize: int | None = DEFAULT_MAXSIZE
+    max_bytes: int | None = None
+    hits: int = 0
+    misses: int = 0
+    nbytes: int = 0
+    entries: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get(self, key: tuple) -> tuple[Schedule, float] | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, schedule: Schedule, effective_interest_rate: float):
+        schedule.freeze()
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[0].nbytes
+            self.entries[key] = (schedule, effective_interest_rate)
+            self.nbytes += schedule.nbytes
+            self.evict()
+
+    def evict(self):
+        while self.entries and (
+            (self.maxsize is not None and len(self.entries) > self.maxsize)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (schedule, _) = self.entries.popitem(last=False)
+            self.nbytes -= schedule.nbytes
+
+    def resize(
+        self, maxsize: int | None = DEFAULT_MAXSIZE, max_bytes: int | None = None
+    ):
+        with self.lock:
+            self.maxsize = maxsize
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.nbytes = 0
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                maxsize=self.maxsize,
+                max_bytes=self.max_bytes,
+                currsize=len(self.entries),
+                nbytes=self.nbytes,
+            )
+
+
+# Process-wide cache used by Repayment.generate_schedule(cached=True)
+SCHEDULE_CACHE = ScheduleCache()
@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import count
+
+import numpy as np
+
+
+DATE_CHUNK = 120
+
+
+def add_months(start_dates, months) -> np.ndarray:
+    # Same dates as applying Transaction.default_next_month_date `months` times
+    start = np.asarray(start_dates, dtype="datetime64[us]")
+    month = start.astype("datetime64[M]")
+    offset = start - month.astype("datetime64[us]")
+    offset = np.where(
+        offset >= np.timedelta64(28, "D"), np.timedelta64(27, "D"), offset
+    )
+    dates = (month + months).astype("datetime64[us]") + offset
+    return np.where(months == 0, start, dates)
+
+
+def time_of_day(start: np.ndarray) -> np.ndarray:
+    return start - start.astype("datetime64[D]").astype("datetime64[us]")
+
+
+@dataclass(frozen=True)
+class CalendarRule(ABC):
+    # A rule maps start dates and month numbers to payment dates in one
+    # vectorized step; month 0 is the start row and keeps the start date
+
+    @abstractmethod
+    def dates(self, start_dates, months) -> np.ndarray: ...
+
+    def datetimes(self, start_date: datetime, months) -> list[datetime]:
+        months = np.asarray(months)
+        return self.dates(np.datetime64(start_date, "us"), months).tolist()
+
+    def iter_datetimes(
+        self, start_date: datetime, first: int = 0
+    ) -> Iterator[datetime]:
+        for chunk in count(first, DATE_CHUNK):
+            yield from self.datetimes(start_date, np.arange(chunk, chunk + DATE_CHUNK))
+
+
+@dataclass(frozen=True)
+class ClampDay28(CalendarRule):
+    # The legacy rule: days after the 28th move to the 28th (dropping the time)
+    def dates(self, start_dates, months) -> np.ndarray:
+        return add_months(start_dates, months)
+
+
+@dataclass(frozen=True)
+class EndOfMonth(CalendarRule):
+    def dates(self, start_dates, months) -> np.ndarray:
+        start = np.asarray(start_dates, dtype="datetime64[us]")
+        month = start.astype("datetime64[M]") + months
+        last_day = (month + 1).astype("datetime64[D]") - 1
+        dates = last_day.astype("datetime64[us]") + time_of_day(start)
+        return np.where(months == 0, start, dates)
+
+
+@dataclass(frozen=True)
+class FixedDay(CalendarRule):
+    # Pays on `day` of every month, or on the last day of shorter months
+    day: int
+
+    def __post_init__(self):
+        if not 1 <= self.day <= 31:
+            raise ValueError(f"Invalid day of month: {self.day}")
+
+    def dates(self, start_dates, months) -> np.ndarray:
+        start = np.asarray(start_dates, dtype="datetime64[us]")
+        month = start.astype("datetime64[M]") + months
+        last_day = (month + 1).astype("datetime64[D]") - 1
+        day = np.minimum(month.astype("datetime64[D]") + (self.day - 1), last_day)
+        dates = day.astype("datetime64[us]") + time_of_day(start)
+        return np.where(months == 0, start, dates)
+
+
+def load_holidays(path: str) -> tuple[str, ...]:
+    # One ISO date per line, blank lines and `#` comments are skipped
+    with open(path, encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return tuple(line for line in lines if line)
+
+
+@lru_cache(maxsize=64)
+def business_calendar(
+    holidays: "tuple[str, ...] | str", weekmask: str
+) -> np.busdaycalendar:
+    # Parsed once per holiday table (or file path) and weekmask
+    if isinstance(holidays, str):
+        holidays = load_holidays(holidays)
+    return np.busdaycalendar(
+        weekmask=weekmask, holidays=np.array(holidays, dtype="datetime64[D]")
+    )
+
+
+# np.busday_offset rolls that keep a date in its month, so every payment
+# stays in its month and quarter
+ROLLS = ("modifiedfollowing", "modifiedpreceding")
+
+
+@dataclass(frozen=True)
+class HolidayShift(CalendarRule):
+    # Moves the dates of `rule` off weekends and holidays. holidays is a
+    # tuple of ISO dates or the path of a file read by load_holidays, roll is
+    # one of ROLLS
+    rule: CalendarRule = ClampDay28()
+    holidays: "tuple[str, ...] | str" = ()
+    roll: str = "modifiedfollowing"
+    weekmask: str = "1111100"
+
+    def __post_init__(self):
+        if self.roll not in ROLLS:
+            raise ValueError(
+                f"Unsupported roll: {self.roll}, expected one of {', '.join(ROLLS)}"
+            )
+        if not isinstance(self.holidays, str):
+            object.__setattr__(
+                self, "holidays", tuple(str(day) for day in self.holidays)
+            )
+
+    def dates(self, start_dates, months) -> np.ndarray:
+        dates = self.rule.dates(start_dates, months)
+        days = dates.astype("datetime64[D]")
+        shifted = np.busday_offset(
+            days,
+            0,
+            roll=self.roll,
+            busdaycal=business_calendar(self.holidays, self.weekmask),
+        )
+        shifted = shifted.astype("datetime64[us]") + (
+            dates - days.astype("datetime64[us]")
+        )
+        return np.where(months == 0, dates, shifted)
+
+
+DEFAULT_CALENDAR = ClampDay28()
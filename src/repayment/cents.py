@@ -0,0 +1,114 @@
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from .calendars import DEFAULT_CALENDAR, CalendarRule
+from .engine import SCHEDULE_DTYPE, Schedule, month_dates
+
+
+ROUNDING = {"half-even": ROUND_HALF_EVEN, "half-up": ROUND_HALF_UP}
+RATE_SCALE = 10**6  # annual rates in millionths, 0.0345 -> 34500
+MONTHLY_SCALE = 12 * RATE_SCALE
+
+
+def check_rounding(rounding: str):
+    if rounding not in ROUNDING:
+        raise ValueError(f"Unknown rounding policy: {rounding}")
+
+
+def scaled(value: float, exponent: int, rounding: str) -> int:
+    # Converts from the shortest decimal repr, so 0.1 is 10 cents, not
+    # the binary approximation of 0.1 times 100
+    check_rounding(rounding)
+    decimal = Decimal(repr(float(value))).scaleb(exponent)
+    return int(decimal.quantize(Decimal(1), rounding=ROUNDING[rounding]))
+
+
+def to_cents(value: float, rounding: str = "half-even") -> int:
+    return scaled(value, 2, rounding)
+
+
+def scale_rate(interest_rate: float) -> int:
+    # Rounding the rate would change every interest amount, so a rate that
+    # is not a whole number of millionths is rejected instead
+    decimal = Decimal(repr(float(interest_rate))).scaleb(6)
+    if decimal != decimal.to_integral_value():
+        raise ValueError(
+            f"Interest rate {interest_rate} has more than 6 decimals, "
+            "the cents engine only takes whole millionths"
+        )
+    return int(decimal)
+
+
+def divide(numerator, denominator: int, rounding: str):
+    # Rounded division of non-negative integers or int64 arrays
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if rounding == "half-up":
+        return quotient + (twice >= denominator)
+    return quotient + (
+        (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    )
+
+
+def amortize_cents(
+    balance: int, rate: int, installment: int, rounding: str
+) -> list[int]:
+    # Month.update_month on integer cents: the interest is the only division,
+    # everything else is exact integer addition
+    balances = [balance]
+    half_up = rounding == "half-up"
+    while balance != 0:
+        interest, remainder = divmod(-balance * rate, MONTHLY_SCALE)
+        twice = 2 * remainder
+        if twice > MONTHLY_SCALE or (
+            twice == MONTHLY_SCALE and (half_up or interest % 2 == 1)
+        ):
+            interest += 1
+        if -balance + interest <= installment:
+            balance = 0
+        else:
+            principal = installment - interest
+            if principal <= 0:
+                raise ValueError("Monthly installment does not cover the interest")
+            balance += principal
+        balances.append(balance)
+    return balances
+
+
+def compute_schedule_cents(
+    interest_rate: float,
+    monthly_installment: float,
+    initial_balance: float,
+    start_date: datetime,
+    rounding: str = "half-even",
+    calendar: CalendarRule | None = None,
+) -> Schedule:
+    check_rounding(rounding)
+    rate = scale_rate(interest_rate)
+    installment = to_cents(monthly_installment, rounding)
+    initial = to_cents(initial_balance, rounding)
+    if abs(initial) * max(rate, 1) >= 2**63:
+        raise ValueError("Balance and rate exceed the int64 cents range")
+    balance = np.array(
+        amortize_cents(initial, rate, installment, rounding), dtype=np.int64
+    )
+    count = len(balance)
+
+    previous = balance[:-1]
+    interest = divide(-previous * rate, MONTHLY_SCALE, rounding)
+    principal = balance[1:] - previous
+
+    rows = np.zeros(count, dtype=SCHEDULE_DTYPE)
+    rows["month_id"] = np.arange(count)
+    rows["date"] = month_dates(start_date, count, calendar or DEFAULT_CALENDAR)
+    rows["principal"][1:] = principal / 100
+    rows["interest"][1:] = interest / 100
+    rows["installment"][1:] = (interest + principal) / 100
+    rows["balance"] = balance / 100
+    return Schedule(
+        rows=rows,
+        monthly_interest_rate=interest_rate / 12,
+        monthly_installment=monthly_installment,
+    )
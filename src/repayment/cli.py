@@ -0,0 +1,244 @@
+import argparse
+import base64
+import json
+import os
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from .core import Repayment
+from .lang import CURRENCIES, LOCALES
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from .aio import AsyncExecutor
+
+
+FONTS_PATH = os.path.join(os.path.dirname(__file__), "fonts")
+LOAN_FIELDS = ("interest_rate", "monthly_installment", "initial_balance", "start_date")
+
+
+def loan_from_dict(data: dict) -> Repayment:
+    missing = [name for name in LOAN_FIELDS if name not in data]
+    if missing:
+        raise ValueError(f"Missing loan fields: {', '.join(missing)}")
+    return Repayment(
+        interest_rate=float(data["interest_rate"]),
+        monthly_installment=float(data["monthly_installment"]),
+        initial_balance=float(data["initial_balance"]),
+        start_date=datetime.fromisoformat(data["start_date"]),
+    )
+
+
+def summary_dict(repayment: Repayment) -> dict:
+    summary = repayment.summary()
+    return {
+        "installments": summary.installments,
+        "final_installment": summary.final_installment,
+        "total_interest": summary.total_interest,
+        "total_paid": summary.total_paid,
+        "payoff_date": summary.payoff_date.date().isoformat(),
+        "monthly_installment": repayment.monthly_installment,
+        "effective_interest_rate": repayment.effective_interest_rate,
+    }
+
+
+def summary_worker(loan: dict) -> dict:
+    # Runs in the process pool, only the small dict travels back. The summary
+    # is summed from the schedule computed here, not amortized again.
+    repayment = Repayment(**loan)
+    if repayment.schedule is None:
+        repayment.generate_schedule(engine="numpy")
+    return summary_dict(repayment)
+
+
+def output_path(output_dir: str | None, name: str) -> str:
+    # Client-supplied names are resolved inside output_dir, anything that
+    # escapes it (absolute paths, "..", symlinks) is rejected
+    if output_dir is None:
+        raise ValueError("PDF files are disabled, the server has no --output-dir")
+    root = os.path.realpath(output_dir)
+    path = os.path.realpath(os.path.join(root, name))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Output outside the output directory: {name}")
+    return path
+
+
+def print_summary(repayment: Repayment):
+    # No schedule is built, summary() runs the balance recursion on floats
+    # and NumPy is never imported
+    summary = summary_dict(repayment)
+    del summary["effective_interest_rate"]
+    print(json.dumps(summary))
+
+
+async def handle_request(
+    request: dict, executor: "AsyncExecutor", output_dir: str | None = None
+) -> dict:
+    from .aio import render_pdf_async
+    from .parallel import loan_parameters
+
+    action = request.get("action", "schedule")
+    repayment = loan_from_dict(request)
+    if action == "schedule":
+        return await executor.run(summary_worker, loan_parameters(repayment))
+    if action == "pdf":
+        output = None
+        if "output" in request:
+            output = output_path(output_dir, request["output"])
+        document = await render_pdf_async(
+            repayment,
+            output,
+            language=request.get("language", "EN"),
+            currency=CURRENCIES[request.get("currency", "EUR")],
+            fonts_path=executor.fonts_path,
+            executor=executor,
+        )
+        if output is None:
+            return {"pdf": base64.b64encode(document).decode()}
+        return {"output": request["output"]}
+    raise ValueError(f"Unknown action: {action}")
+
+
+async def handle_connection(
+    reader: "asyncio.StreamReader",
+    writer: "asyncio.StreamWriter",
+    executor: "AsyncExecutor",
+    output_dir: str | None = None,
+):
+    # One JSON object per line in, one JSON object per line out, in order.
+    # Connections are served concurrently, the executor bounds the CPU work.
+    try:
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            try:
+                response = await handle_request(json.loads(line), executor, output_dir)
+            except Exception as error:
+                response = {"error": f"{type(error).__name__}: {error}"}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(
+    host: str, port: int, executor: "AsyncExecutor", output_dir: str | None = None
+):
+    import asyncio
+
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(reader, writer, executor, output_dir),
+        host,
+        port,
+    )
+    address = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving on {address}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def add_loan_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--interest-rate", type=float, required=True)
+    parser.add_argument("--monthly-installment", type=float, required=True)
+    parser.add_argument(
+        "--initial-balance", type=float, required=True, help="negative, e.g. -5000"
+    )
+    parser.add_argument(
+        "--start-date", type=datetime.fromisoformat, required=True, help="YYYY-MM-DD"
+    )
+
+
+def loan_from_args(args: argparse.Namespace) -> Repayment:
+    return Repayment(
+        interest_rate=args.interest_rate,
+        monthly_installment=args.monthly_installment,
+        initial_balance=args.initial_balance,
+        start_date=args.start_date,
+    )
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="repayment", description="Repayment Plan Generator"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summary = commands.add_parser("summary", help="print the loan summary as JSON")
+    add_loan_arguments(summary)
+
+    schedule = commands.add_parser(
+        "schedule", help="write the schedule as CSV or JSON Lines"
+    )
+    add_loan_arguments(schedule)
+    schedule.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    schedule.add_argument("--output", default="-", help="file path, - for stdout")
+
+    pdf = commands.add_parser("pdf", help="render the repayment plan as PDF")
+    add_loan_arguments(pdf)
+    pdf.add_argument("--output", required=True)
+    pdf.add_argument("--language", choices=sorted(LOCALES), default="EN")
+    pdf.add_argument("--currency", choices=sorted(CURRENCIES), default="EUR")
+    pdf.add_argument("--fonts-path", default=FONTS_PATH)
+
+    server = commands.add_parser("serve", help="serve JSON Lines requests over TCP")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--workers", type=int, default=None)
+    server.add_argument("--max-concurrency", type=int, default=None)
+    server.add_argument("--fonts-path", default=FONTS_PATH)
+    server.add_argument(
+        "--output-dir", default=None, help="directory for PDF files, off by default"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    # Subcommands import their dependencies on first use, so `summary` never
+    # loads NumPy and only `pdf` and `serve` load fpdf2
+    args = parser().parse_args(argv)
+    if args.command == "summary":
+        print_summary(loan_from_args(args))
+    elif args.command == "schedule":
+        from .export import write_csv, write_jsonl
+
+        repayment = loan_from_args(args)
+        repayment.generate_schedule(engine="numpy")
+        write = write_csv if args.format == "csv" else write_jsonl
+        write(repayment, sys.stdout if args.output == "-" else args.output)
+    elif args.command == "pdf":
+        from .report import PDF
+
+        repayment = loan_from_args(args)
+        PDF.stream_repayment(
+            repayment,
+            args.output,
+            language=args.language,
+            currency=CURRENCIES[args.currency],
+            fonts_path=args.fonts_path,
+        )
+    elif args.command == "serve":
+        import asyncio
+
+        from .aio import AsyncExecutor
+
+        executor = AsyncExecutor(
+            workers=args.workers,
+            max_concurrency=args.max_concurrency,
+            fonts_path=args.fonts_path,
+        )
+        try:
+            asyncio.run(serve(args.host, args.port, executor, args.output_dir))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
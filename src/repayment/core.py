@@ -1,11 +1,28 @@
+import math
+from collections.abc import Iterator
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, NamedTuple
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 
-import numpy_financial as npf
+from .instrument import span
 
+if TYPE_CHECKING:
+    from .calendars import CalendarRule
+    from .engine import Schedule
 
-@dataclass
+
+ENGINES = ("python", "numpy", "cents")
+FINAL_WINDOW = 12
+
+
+def shift_months(date: datetime, months: int) -> datetime:
+    # Same as date + relativedelta(months=months) for days up to 28, which
+    # every payment date after the start is
+    year, month = divmod(date.month - 1 + months, 12)
+    return date.replace(year=date.year + year, month=month + 1)
+
+
+@dataclass(slots=True)
 class Transaction:
     month_id: int = 0
     principal: float = 0.0
@@ -20,27 +37,42 @@ class Transaction:
     def data(self) -> tuple[int, float, float, float]:
         return (self.month_id, self.principal, self.interest, self.installment)
 
+    def add(self, data: tuple[int, float, float, float]):
+        month_id, principal, interest, installment = data
+        self.month_id = month_id
+        self.principal += principal
+        self.interest += interest
+        self.installment += installment
+
+    def rounded(self) -> tuple[int, float, float, float]:
+        tr = Transaction(*self.data())
+        tr.round()
+        return tr.data()
+
     @staticmethod
     def default_next_month_date(date: datetime) -> datetime:
         if date.day > 28:
             date = datetime(year=date.year, month=date.month, day=28)
-        return date + relativedelta(months=1)
+        return shift_months(date, 1)
 
     @staticmethod
-    def pivot(items: list["Month | Quarter | Year"]):
+    def total(items: list["Month | Quarter | Year"]) -> "Transaction":
         tr = Transaction()
         for item in items:
-            data = item.tr.data() if isinstance(item, Month) else item.pivot()
-            month_id, principal, interest, installment = data
-            tr.month_id = month_id
-            tr.principal += principal
-            tr.interest += interest
-            tr.installment += installment
-        tr.round()
-        return tr.data()
+            tr.add(item.tr.data() if isinstance(item, Month) else item.pivot())
+        return tr
 
+    @staticmethod
+    def pivot(items: list["Month | Quarter | Year"]):
+        return Transaction.total(items).rounded()
 
-@dataclass
+
+def same_date(date: datetime) -> datetime:
+    # next_date of a Month chain that Repayment.extend dates from its calendar
+    return date
+
+
+@dataclass(slots=True)
 class Month:
     monthly_interest_rate: float
     next_installment: float
@@ -50,6 +82,7 @@ class Month:
     next_month: "Month | None" = None
     prev_month: "Month | None" = None
     next_date: callable = Transaction.default_next_month_date
+    extra_payment: float = 0.0
 
     def __post_init__(self):
         self.update_month()
@@ -59,18 +92,40 @@ class Month:
             self.balance = round(self.balance, 2)
         else:
             self.tr.interest = round(abs(self.balance) * self.monthly_interest_rate, 2)
-            if abs(self.balance) + self.tr.interest <= self.next_installment:
+            installment = self.next_installment + self.extra_payment
+            if abs(self.balance) + self.tr.interest <= installment:
                 self.tr.principal = -self.balance
                 self.balance = 0
             else:
-                self.tr.principal = max(
-                    0, self.next_installment - round(self.tr.interest, 2)
-                )
+                self.tr.principal = max(0, installment - round(self.tr.interest, 2))
                 self.balance += self.tr.principal
             self.balance = round(self.balance, 2)
             self.tr.installment = self.tr.interest + self.tr.principal
         self.tr.round()
 
+    @classmethod
+    def from_values(
+        cls,
+        monthly_interest_rate: float,
+        next_installment: float,
+        date: datetime,
+        balance: float,
+        tr: Transaction,
+        prev_month: "Month | None" = None,
+    ) -> "Month":
+        # Rebuild an already settled month without running update_month again
+        month = object.__new__(cls)
+        month.monthly_interest_rate = monthly_interest_rate
+        month.next_installment = next_installment
+        month.date = date
+        month.balance = balance
+        month.tr = tr
+        month.next_month = None
+        month.prev_month = prev_month
+        month.next_date = Transaction.default_next_month_date
+        month.extra_payment = 0.0
+        return month
+
     def create_next_month(self):
         if self.balance == 0:
             return None
@@ -88,6 +143,7 @@ class Month:
             balance=self.balance,
             tr=tr,
             prev_month=self,
+            next_date=self.next_date,
         )
 
 
@@ -98,12 +154,36 @@ class Quarter:
     m2: Month | None = None
     m3: Month | None = None
     month_list: list[Month] = field(default_factory=list)
+    # Running sums of month_list and the rounded pivot, rebuilt after a pop
+    _sums: Transaction | None = field(
+        default_factory=Transaction, init=False, repr=False, compare=False
+    )
+    _pivot: tuple | None = field(default=None, init=False, repr=False, compare=False)
 
     def add_month(self, month: Month):
         self.month_list.append(month)
+        if self._sums is not None:
+            self._sums.add(month.tr.data())
+        self._pivot = None
+
+    def pop_month(self) -> Month:
+        month = self.month_list.pop()
+        if self.m1 is month:
+            self.m1 = None
+        elif self.m2 is month:
+            self.m2 = None
+        elif self.m3 is month:
+            self.m3 = None
+        self._sums = None
+        self._pivot = None
+        return month
 
     def pivot(self):
-        return Transaction.pivot(self.month_list)
+        if self._pivot is None:
+            if self._sums is None:
+                self._sums = Transaction.total(self.month_list)
+            self._pivot = self._sums.rounded()
+        return self._pivot
 
 
 @dataclass
@@ -114,11 +194,17 @@ class Year:
     q3: Quarter = field(default_factory=lambda: Quarter(3))
     q4: Quarter = field(default_factory=lambda: Quarter(4))
     quarter_list: list[Quarter] = field(default_factory=list)
+    # Sum of the pivots of all but the last quarter, the last one may still
+    # grow; adding its pivot last keeps the order of Transaction.pivot
+    _closed: Transaction | None = field(
+        default_factory=Transaction, init=False, repr=False, compare=False
+    )
+    _pivot: tuple | None = field(default=None, init=False, repr=False, compare=False)
 
     def add_month(self, month: Month):
         quarter_number = (month.date.month - 1) // 3 + 1
         month_in_quarter = (month.date.month - 1) % 3 + 1
-        quarter: Quarter = getattr(self, f"q{quarter_number}")
+        quarter: Quarter = (self.q1, self.q2, self.q3, self.q4)[quarter_number - 1]
 
         if month_in_quarter == 1:
             quarter.m1 = month
@@ -129,13 +215,144 @@ class Year:
         else:
             raise ValueError("Invalid month in quarter")
 
-        if quarter not in self.quarter_list:
+        # Identity check, `in` would fall back to comparing the Month lists
+        if all(q is not quarter for q in self.quarter_list):
+            if self._closed is not None and self.quarter_list:
+                self._closed.add(self.quarter_list[-1].pivot())
             self.quarter_list.append(quarter)
+        elif quarter is not self.quarter_list[-1]:
+            self._closed = None
 
         quarter.add_month(month)
+        self._pivot = None
+
+    def pop_month(self) -> Month:
+        quarter = self.quarter_list[-1]
+        month = quarter.pop_month()
+        if not quarter.month_list:
+            self.quarter_list.pop()
+            self._closed = None
+        self._pivot = None
+        return month
 
     def pivot(self):
-        return Transaction.pivot(self.quarter_list)
+        if self._pivot is None:
+            self._pivot = rollup(self, self.quarter_list)
+        return self._pivot
+
+
+def rollup(parent: "Year | Repayment", children: list) -> tuple:
+    if parent._closed is None:
+        parent._closed = Transaction.total(children[:-1])
+    tr = Transaction(*parent._closed.data())
+    if children:
+        tr.add(children[-1].pivot())
+    return tr.rounded()
+
+
+class ScheduleRow(NamedTuple):
+    # kind is "month", or "quarter"/"year"/"total" for the subtotal emitted
+    # when that period ends; subtotals carry the date and balance of its
+    # last month and are rounded like Transaction.pivot
+    kind: str
+    month_id: int
+    date: datetime
+    principal: float
+    interest: float
+    installment: float
+    balance: float
+
+
+@dataclass
+class Summary:
+    installments: int
+    final_installment: float
+    total_interest: float
+    total_paid: float
+    payoff_date: datetime
+    # Largest possible deviation of final_installment, total_interest and
+    # total_paid from the full schedule, 0.0 when they match to the cent
+    tolerance: float = 0.0
+
+
+def rounding_drift(monthly_interest_rate: float, months: int) -> float:
+    # Bound on how far the closed-form balance can be from the rounded one:
+    # each month rounds interest and balance by at most half a cent each,
+    # and earlier errors grow with the interest
+    if not monthly_interest_rate:
+        return 0.01 * months
+    growth = (1 + monthly_interest_rate) ** months
+    return 0.01 * (growth - 1) / monthly_interest_rate
+
+
+def settle(balance: float, monthly_interest_rate: float, monthly_installment: float):
+    # Month.update_month rules on plain floats, returns the number of months
+    # until the balance is paid off and the last installment
+    months = 0
+    installment = 0.0
+    while balance != 0:
+        interest = round(abs(balance) * monthly_interest_rate, 2)
+        if abs(balance) + interest <= monthly_installment:
+            installment = round(interest + abs(balance), 2)
+            balance = 0
+        else:
+            next_balance = round(balance + max(0, monthly_installment - interest), 2)
+            if next_balance == balance:
+                raise ValueError("Monthly installment does not cover the interest")
+            balance = next_balance
+        months += 1
+    return months, installment
+
+
+def with_subtotals(months: Iterator[ScheduleRow]) -> Iterator[ScheduleRow]:
+    # Passes the month rows through and adds a "quarter"/"year" row when that
+    # period ends and a "total" row at the end, summed like the Quarter/Year
+    # pivots. Only the totals of the current quarter and year are held.
+    quarter_total = [0.0, 0.0, 0.0]
+    year_total = [0.0, 0.0, 0.0]
+    total = [0.0, 0.0, 0.0]
+    month = next(months)
+    while True:
+        yield month
+        quarter_total[0] += month.principal
+        quarter_total[1] += month.interest
+        quarter_total[2] += month.installment
+        next_month = next(months, None)
+
+        quarter_end = next_month is None or (
+            (next_month.date.month - 1) // 3 != (month.date.month - 1) // 3
+            or next_month.date.year != month.date.year
+        )
+        if quarter_end:
+            quarter_total = [round(value, 2) for value in quarter_total]
+            yield month._replace(
+                kind="quarter",
+                principal=quarter_total[0],
+                interest=quarter_total[1],
+                installment=quarter_total[2],
+            )
+            for position, value in enumerate(quarter_total):
+                year_total[position] += value
+            quarter_total = [0.0, 0.0, 0.0]
+        if next_month is None or next_month.date.year != month.date.year:
+            year_total = [round(value, 2) for value in year_total]
+            yield month._replace(
+                kind="year",
+                principal=year_total[0],
+                interest=year_total[1],
+                installment=year_total[2],
+            )
+            for position, value in enumerate(year_total):
+                total[position] += value
+            year_total = [0.0, 0.0, 0.0]
+        if next_month is None:
+            break
+        month = next_month
+
+    total = [round(value, 2) for value in total]
+    yield month._replace(
+        kind="total", principal=total[0], interest=total[1], installment=total[2]
+    )
 
 
 @dataclass
@@ -144,10 +361,21 @@ class Repayment:
     monthly_installment: float
     initial_balance: float
     start_date: datetime
+    # Declared before `years`, whose setter fills them in __init__
+    _years: list[Year] = field(default_factory=list, init=False, repr=False)
+    _year_index: dict[int, Year] = field(default_factory=dict, init=False, repr=False)
+    _closed: Transaction | None = field(
+        default_factory=Transaction, init=False, repr=False, compare=False
+    )
+    _pivot: tuple | None = field(default=None, init=False, repr=False, compare=False)
+    # A property (see below the class), built from `schedule` on first access
     years: list[Year] = field(default_factory=list)
     cache: dict = field(default_factory=dict)
     max_interest_installment_ratio: float = 0.90
     effective_interest_rate: float | None = None
+    schedule: "Schedule | None" = field(default=None, repr=False)
+    # Payment date rule, None keeps Transaction.default_next_month_date
+    calendar: "CalendarRule | None" = field(default=None, repr=False)
 
     def __post_init__(self):
         monthly_interest = self.interest_rate * -self.initial_balance / 12
@@ -172,39 +400,384 @@ class Repayment:
 
         self.cache["log__Repayment"] = {"__post_init__": log_post_init}  # Log 1
 
+    def get_years(self) -> list[Year]:
+        if not self._years and self.schedule is not None:
+            with span("aggregation", engine="numpy") as aggregation_span:
+                for month in self.schedule.months():
+                    self.add_month(month)
+                aggregation_span.set(months=len(self.schedule))
+        return self._years
+
+    def set_years(self, years: list[Year]):
+        self._years = years
+        self._year_index = {year.year: year for year in years}
+        # rolled up again on the next pivot unless there is nothing to sum
+        self._closed = None if years else Transaction()
+        self._pivot = None
+
     def calculate_effective_interest_rate(self):
+        from .irr import effective_interest_rate
+
         cash_flows = []
         cash_flows.append(self.initial_balance)
-        for year in self.years:
-            for quarter in year.quarter_list:
-                for month in quarter.month_list:
-                    cash_flows.append(month.tr.installment)
-        irr = npf.irr(cash_flows)
-        effective_interest_rate = (1 + irr) ** 12 - 1
-        return effective_interest_rate
+        if self.schedule is not None:
+            cash_flows.extend(self.schedule.installment)
+        else:
+            for year in self.years:
+                for quarter in year.quarter_list:
+                    for month in quarter.month_list:
+                        cash_flows.append(month.tr.installment)
+        with span("irr", months=len(cash_flows) - 1):
+            return float(effective_interest_rate(cash_flows, self.interest_rate))
 
     def add_month(self, month: Month):
         year_number = month.date.year
-        year = next((y for y in self.years if y.year == year_number), None)
-        if not year:
+        year = self._year_index.get(year_number)
+        if year is None:
             year = Year(year=year_number)
-            self.years.append(year)
+            if self._closed is not None and self._years:
+                self._closed.add(self._years[-1].pivot())
+            self._years.append(year)
+            self._year_index[year_number] = year
+        elif year is not self._years[-1]:
+            self._closed = None
         year.add_month(month)
+        self._pivot = None
+
+    def pop_month(self) -> Month:
+        year = self._years[-1]
+        month = year.pop_month()
+        if not year.quarter_list:
+            self._years.pop()
+            del self._year_index[year.year]
+            self._closed = None
+        self._pivot = None
+        return month
+
+    def extend(self, current_month: Month | None):
+        months = []
+        with span("schedule", engine="python") as schedule_span:
+            while current_month:
+                months.append(current_month)
+                current_month = current_month.create_next_month()
+            if self.calendar is not None:
+                # The balances do not depend on the dates, so the Month chain
+                # is built with same_date and dated in one vectorized step
+                month_ids = [month.tr.month_id for month in months]
+                for month, date in zip(
+                    months, self.calendar.datetimes(self.start_date, month_ids)
+                ):
+                    month.date = date
+            schedule_span.set(months=len(months))
+        with span("aggregation", engine="python", months=len(months)):
+            for month in months:
+                self.add_month(month)
+        self.effective_interest_rate = self.calculate_effective_interest_rate()
 
-    def generate_schedule(self):
+    def generate_schedule(
+        self, engine: str = "python", cached: bool = False, rounding: str = "half-even"
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if cached and engine != "numpy":
+            raise ValueError("The schedule cache requires the numpy engine")
+        self._years = []
+        self._year_index = {}
+        self._closed = Transaction()
+        self._pivot = None
+        self.schedule = None
+        if engine == "cents":
+            from .cents import compute_schedule_cents
+
+            with span("schedule", engine="cents") as schedule_span:
+                self.schedule = compute_schedule_cents(
+                    interest_rate=self.interest_rate,
+                    monthly_installment=self.monthly_installment,
+                    initial_balance=self.initial_balance,
+                    start_date=self.start_date,
+                    rounding=rounding,
+                    calendar=self.calendar,
+                )
+                schedule_span.set(months=len(self.schedule))
+            self.effective_interest_rate = self.calculate_effective_interest_rate()
+            return
+        if engine == "numpy":
+            from .engine import compute_schedule
+
+            if cached:
+                from .cache import SCHEDULE_CACHE, loan_key
+
+                key = loan_key(self)
+                entry = SCHEDULE_CACHE.get(key)
+                if entry is not None:
+                    self.schedule, self.effective_interest_rate = entry
+                    return
+
+            with span("schedule", engine="numpy") as schedule_span:
+                self.schedule = compute_schedule(
+                    interest_rate=self.interest_rate,
+                    monthly_installment=self.monthly_installment,
+                    initial_balance=self.initial_balance,
+                    start_date=self.start_date,
+                    calendar=self.calendar,
+                )
+                schedule_span.set(months=len(self.schedule))
+            self.effective_interest_rate = self.calculate_effective_interest_rate()
+            if cached:
+                SCHEDULE_CACHE.put(key, self.schedule, self.effective_interest_rate)
+            return
         current_month = Month(
             monthly_interest_rate=self.interest_rate / 12,
             next_installment=self.monthly_installment,
             date=self.start_date,
             balance=self.initial_balance,
         )
-        while current_month:
-            self.add_month(current_month)
-            current_month = current_month.create_next_month()
-        self.effective_interest_rate = self.calculate_effective_interest_rate()
+        if self.calendar is not None:
+            current_month.next_date = same_date
+        self.extend(current_month)
+
+    def recompute_from(
+        self,
+        month_id: int,
+        new_installment: float | None = None,
+        extra_payment: float = 0.0,
+    ):
+        # Months before month_id and their years/quarters are kept, only the
+        # tail is dropped (newest first, via prev_month) and regenerated. The
+        # new installment is carried by the regenerated months, the loan's
+        # monthly_installment keeps the original terms.
+        years = self.years
+        if not years or month_id < 1:
+            raise ValueError(f"Month {month_id} is not part of the schedule")
+        last_month = years[-1].quarter_list[-1].month_list[-1]
+        if month_id > last_month.tr.month_id:
+            raise ValueError(f"Month {month_id} is not part of the schedule")
+        kept_month = last_month
+        while kept_month.tr.month_id >= month_id:
+            kept_month = kept_month.prev_month
+
+        # checked before anything is dropped, a rejected edit keeps the schedule
+        installment = (
+            kept_month.next_installment if new_installment is None else new_installment
+        )
+        interest = round(abs(kept_month.balance) * kept_month.monthly_interest_rate, 2)
+        if installment <= interest:
+            raise ValueError("Monthly installment does not cover the interest")
+        if (
+            new_installment is not None
+            and interest > self.max_interest_installment_ratio * new_installment
+        ):
+            raise ValueError(
+                "Interest exceeds max_interest_installment_ratio of the new installment"
+            )
+
+        self.schedule = None
+        while last_month is not kept_month:
+            self.pop_month()
+            last_month = last_month.prev_month
+
+        next_date = last_month.next_date if self.calendar is None else same_date
+        current_month = Month(
+            monthly_interest_rate=last_month.monthly_interest_rate,
+            next_installment=installment,
+            date=next_date(last_month.date),
+            balance=last_month.balance,
+            tr=Transaction(month_id=month_id),
+            prev_month=last_month,
+            next_date=next_date,
+            extra_payment=extra_payment,
+        )
+        self.extend(current_month)
 
     def pivot(self):
-        return Transaction.pivot(self.years)
+        if self._pivot is None:
+            self._pivot = rollup(self, self.years)
+        return self._pivot
+
+    def year(self, year_number: int) -> Year:
+        self.years  # builds the year index of a numpy engine schedule
+        if year_number not in self._year_index:
+            raise ValueError(f"Year {year_number} is not part of the schedule")
+        return self._year_index[year_number]
+
+    def date_index(self) -> "Schedule":
+        # Date queries run on the packed Schedule; a python engine schedule is
+        # packed once and dropped again by recompute_from/generate_schedule
+        if self.schedule is None:
+            from .engine import schedule_from_months
+
+            self.schedule = schedule_from_months(
+                (
+                    month
+                    for year in self.years
+                    for quarter in year.quarter_list
+                    for month in quarter.month_list
+                ),
+                self.interest_rate / 12,
+                self.monthly_installment,
+            )
+        return self.schedule
+
+    def iter_schedule(self) -> Iterator[ScheduleRow]:
+        # An existing schedule (numpy engine, what-if edits, segments) is
+        # streamed as it is, otherwise the rows are computed while iterating
+        if self.schedule is not None or self._years:
+            if self.effective_interest_rate is None:
+                self.effective_interest_rate = self.calculate_effective_interest_rate()
+            return with_subtotals(self.scheduled_rows())
+        return with_subtotals(self.amortized_rows())
+
+    def scheduled_rows(self) -> Iterator[ScheduleRow]:
+        if self.schedule is not None:
+            return self.schedule.iter_rows()
+        return (
+            ScheduleRow(
+                "month",
+                month.tr.month_id,
+                month.date,
+                month.tr.principal,
+                month.tr.interest,
+                month.tr.installment,
+                month.balance,
+            )
+            for year in self._years
+            for quarter in year.quarter_list
+            for month in quarter.month_list
+        )
+
+    def amortized_rows(self) -> Iterator[ScheduleRow]:
+        # Month rows computed with the Month.update_month rules and yielded one
+        # by one, memory stays constant however long the schedule is. The
+        # effective interest rate is solved from run-length encoded cash
+        # flows and set once the last month has been yielded.
+        from .calendars import DEFAULT_CALENDAR
+        from .irr import irr_runs
+
+        rate = self.interest_rate / 12
+        next_installment = self.monthly_installment
+        balance = round(self.initial_balance, 2)
+        date = self.start_date
+        dates = (self.calendar or DEFAULT_CALENDAR).iter_datetimes(date, first=1)
+        month = ScheduleRow("month", 0, date, 0.0, 0.0, 0.0, balance)
+        runs = [[self.initial_balance, 0, 1]]
+
+        while True:
+            yield month
+            if month.installment == runs[-1][0]:
+                runs[-1][2] += 1
+            else:
+                runs.append([month.installment, month.month_id + 1, 1])
+            if balance == 0:
+                break
+
+            date = next(dates)
+            interest = round(abs(balance) * rate, 2)
+            if abs(balance) + interest <= next_installment:
+                principal = -balance
+                balance = 0
+            else:
+                principal = max(0, next_installment - interest)
+                balance += principal
+            balance = round(balance, 2)
+            if balance == month.balance:
+                raise ValueError("Monthly installment does not cover the interest")
+            month = ScheduleRow(
+                "month",
+                month.month_id + 1,
+                date,
+                round(principal, 2),
+                interest,
+                round(interest + principal, 2),
+                balance,
+            )
+
+        irr = irr_runs(runs, guess=rate)
+        self.effective_interest_rate = (1 + irr) ** 12 - 1
+
+    def summary(self, exact: bool = True) -> Summary:
+        # The balance recursion on plain floats, without Month objects, which
+        # matches the schedule to the cent. exact=False uses the closed-form
+        # annuity up to the last FINAL_WINDOW months and settles only those:
+        # the term and payoff date still match (the settled term is checked
+        # against both ends of the rounding drift), the totals are within
+        # Summary.tolerance. A generated or edited schedule is summed as it is.
+        if self._years:
+            last_month = self._years[-1].quarter_list[-1].month_list[-1]
+            installments, _, total_interest, total_paid = self.pivot()
+            return Summary(
+                installments=installments,
+                final_installment=last_month.tr.installment,
+                total_interest=total_interest,
+                total_paid=total_paid,
+                payoff_date=last_month.date,
+            )
+        if self.schedule is not None:
+            return Summary(
+                installments=len(self.schedule) - 1,
+                final_installment=float(self.schedule.installment[-1]),
+                total_interest=round(math.fsum(self.schedule.interest.tolist()), 2),
+                total_paid=round(math.fsum(self.schedule.installment.tolist()), 2),
+                payoff_date=self.schedule.date[-1].tolist(),
+            )
+
+        balance = round(self.initial_balance, 2)
+        rate = self.interest_rate / 12
+        installment = self.monthly_installment
+        skipped = 0
+        tolerance = 0.0
+        if not exact and balance != 0:
+            if rate * abs(balance) >= installment:
+                raise ValueError("Monthly installment does not cover the interest")
+            if rate:
+                term = math.log(installment / (installment - rate * abs(balance)))
+                term = math.ceil(term / math.log(1 + rate))
+            else:
+                term = math.ceil(abs(balance) / installment)
+            skipped = max(0, term - FINAL_WINDOW)
+            if rate:
+                growth = (1 + rate) ** skipped
+                remaining = abs(balance) * growth - installment * (growth - 1) / rate
+            else:
+                remaining = abs(balance) - installment * skipped
+            # the number of months is monotone in the balance, equal terms at
+            # both ends of the drift fix the term of the real balance
+            drift = rounding_drift(rate, skipped) + 0.01
+            if (
+                skipped
+                and remaining - drift > 0
+                and (
+                    settle(-(remaining - drift), rate, installment)[0]
+                    == settle(-(remaining + drift), rate, installment)[0]
+                )
+            ):
+                balance = -round(remaining, 2)
+            else:
+                skipped = 0
+
+        months, final_installment = settle(balance, rate, installment)
+        installments = skipped + months
+        if skipped:
+            tolerance = math.ceil(rounding_drift(rate, installments) * 100 + 1) / 100
+        total_paid = 0.0
+        if installments:
+            total_paid = round(
+                (installments - 1) * round(installment, 2) + final_installment, 2
+            )
+        payoff_date = self.start_date
+        if installments and self.calendar is not None:
+            payoff_date = self.calendar.datetimes(self.start_date, [installments])[0]
+        elif installments:
+            payoff_date = shift_months(
+                Transaction.default_next_month_date(payoff_date), installments - 1
+            )
+        return Summary(
+            installments=installments,
+            final_installment=final_installment,
+            total_interest=round(total_paid - abs(round(self.initial_balance, 2)), 2),
+            total_paid=total_paid,
+            payoff_date=payoff_date,
+            tolerance=tolerance,
+        )
 
     def display_year(self, year_id: int) -> int:
         for quarter in self.years[year_id].quarter_list:
@@ -212,3 +785,7 @@ class Repayment:
             for month in quarter.month_list:
                 print(" " * 2, month.tr.data(), month.balance, month.date, sep=" " * 5)
         return self.years[year_id].year
+
+
+# After the class body, so the dataclass keeps `years` as an init field
+Repayment.years = property(Repayment.get_years, Repayment.set_years)
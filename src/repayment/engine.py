@@ -0,0 +1,249 @@
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+from .calendars import DEFAULT_CALENDAR, CalendarRule
+from .core import Month, ScheduleRow, Transaction
+
+
+SPLITTER = 134217729.0  # 2**27 + 1, Dekker split of a double into 26-bit halves
+
+
+def round_cents(values) -> np.ndarray:
+    # Element-wise equivalent of round(x, 2): the product x * 100 is split into
+    # its float result and exact error term, so values that only look like a
+    # half cent after the multiplication are rounded the same way Python does.
+    x = np.asarray(values, dtype=np.float64)
+    scaled = x * 100.0
+    split = SPLITTER * x
+    high = split - (split - x)
+    low = x - high
+    error = (high * 100.0 - scaled) + low * 100.0
+    floor = np.floor(scaled)
+    fraction = scaled - floor
+    tie = fraction == 0.5
+    up = (fraction > 0.5) | (
+        tie & ((error > 0) | ((error == 0) & (np.fmod(floor, 2) != 0)))
+    )
+    return (floor + up) / 100.0
+
+
+def month_dates(
+    start_date: datetime, count: int, calendar: CalendarRule = DEFAULT_CALENDAR
+) -> np.ndarray:
+    return calendar.dates(np.datetime64(start_date, "us"), np.arange(count))
+
+
+def amortize(
+    initial_balance: float,
+    monthly_interest_rate: float,
+    monthly_installment: float,
+    extra_payment: float = 0.0,
+    months: int | None = None,
+) -> np.ndarray:
+    # Only the balance recursion is sequential, the remaining columns are
+    # derived from it in bulk by compute_schedule. Stops after `months` months
+    # (None: once paid off), extra_payment is added to the first installment.
+    balance = round(initial_balance, 2)
+    balances = [balance]
+    payment = monthly_installment + extra_payment
+    while balance != 0 and (months is None or len(balances) <= months):
+        interest = round(abs(balance) * monthly_interest_rate, 2)
+        if abs(balance) + interest <= payment:
+            balance = 0.0
+        else:
+            balance = round(balance + max(0, payment - interest), 2)
+            if balance == balances[-1]:
+                raise ValueError("Monthly installment does not cover the interest")
+        balances.append(balance)
+        payment = monthly_installment
+    return np.array(balances, dtype=np.float64)
+
+
+SCHEDULE_DTYPE = np.dtype(
+    [
+        ("month_id", np.int32),
+        ("date", "datetime64[us]"),
+        ("principal", np.float64),
+        ("interest", np.float64),
+        ("installment", np.float64),
+        ("balance", np.float64),
+    ]
+)
+
+
+@dataclass
+class Schedule:
+    # One packed record per month (44 bytes), Month objects are only created
+    # when a row is accessed
+    rows: np.ndarray
+    monthly_interest_rate: float = 0.0
+    monthly_installment: float = 0.0
+    # Running principal/interest/installment sums, built on first use
+    _cumulative: np.ndarray | None = field(default=None, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> Month:
+        return self.month(self.rows[index])
+
+    @property
+    def month_id(self) -> np.ndarray:
+        return self.rows["month_id"]
+
+    @property
+    def date(self) -> np.ndarray:
+        return self.rows["date"]
+
+    @property
+    def principal(self) -> np.ndarray:
+        return self.rows["principal"]
+
+    @property
+    def interest(self) -> np.ndarray:
+        return self.rows["interest"]
+
+    @property
+    def installment(self) -> np.ndarray:
+        return self.rows["installment"]
+
+    @property
+    def balance(self) -> np.ndarray:
+        return self.rows["balance"]
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes
+
+    def cumulative(self) -> np.ndarray:
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(
+                np.column_stack((self.principal, self.interest, self.installment)),
+                axis=0,
+            )
+        return self._cumulative
+
+    def paid_as_of(self, date) -> Transaction:
+        # Totals of all months up to and including date, a binary search over
+        # the dates plus one lookup in the prefix sums
+        index = int(np.searchsorted(self.date, np.datetime64(date, "us"), side="right"))
+        if index == 0:
+            return Transaction()
+        principal, interest, installment = round_cents(
+            self.cumulative()[index - 1]
+        ).tolist()
+        return Transaction(
+            int(self.month_id[index - 1]), principal, interest, installment
+        )
+
+    def position(self, date, side: str = "right") -> int:
+        return int(np.searchsorted(self.date, np.datetime64(date, "us"), side=side))
+
+    def balance_on(self, date) -> float:
+        # Balance after the last payment on or before date
+        index = self.position(date)
+        if index == 0:
+            raise ValueError(f"{date} is before the start of the schedule")
+        return float(self.balance[index - 1])
+
+    def next_payment_after(self, date) -> np.void | None:
+        # First installment strictly after date, month 0 is not a payment
+        index = max(self.position(date), 1)
+        return self.rows[index] if index < len(self.rows) else None
+
+    def between(self, start, end) -> np.ndarray:
+        # Rows with start <= date < end, a view into rows
+        return self.rows[self.position(start, "left") : self.position(end, "left")]
+
+    def freeze(self) -> "Schedule":
+        self.rows.flags.writeable = False
+        return self
+
+    def month(self, row, prev_month: Month | None = None) -> Month:
+        month_id, date, principal, interest, installment, balance = row.tolist()
+        return Month.from_values(
+            monthly_interest_rate=self.monthly_interest_rate,
+            next_installment=self.monthly_installment,
+            date=date,
+            balance=balance,
+            tr=Transaction(month_id, principal, interest, installment),
+            prev_month=prev_month,
+        )
+
+    def months(self):
+        prev_month = None
+        for row in self.rows:
+            prev_month = self.month(row, prev_month)
+            yield prev_month
+
+    def period_counts(self) -> tuple[list[int], list[int], list[int]]:
+        # Year numbers with the number of months and of quarters in each year
+        months = self.date.astype("datetime64[M]").astype(np.int64)
+        years, month_counts = np.unique(months // 12 + 1970, return_counts=True)
+        quarter_years = np.unique(months // 3) // 4 + 1970
+        quarter_counts = np.unique(quarter_years, return_counts=True)[1]
+        return years.tolist(), month_counts.tolist(), quarter_counts.tolist()
+
+    def iter_rows(self) -> Iterator[ScheduleRow]:
+        # Month rows as Repayment.iter_schedule yields them, without subtotals
+        for values in zip(*(self.rows[name].tolist() for name in SCHEDULE_DTYPE.names)):
+            yield ScheduleRow("month", *values)
+
+
+def schedule_from_months(
+    months, monthly_interest_rate: float, monthly_installment: float
+) -> Schedule:
+    rows = np.array(
+        [
+            (
+                month.tr.month_id,
+                month.date,
+                month.tr.principal,
+                month.tr.interest,
+                month.tr.installment,
+                month.balance,
+            )
+            for month in months
+        ],
+        dtype=SCHEDULE_DTYPE,
+    )
+    return Schedule(
+        rows=rows,
+        monthly_interest_rate=monthly_interest_rate,
+        monthly_installment=monthly_installment,
+    )
+
+
+def compute_schedule(
+    interest_rate: float,
+    monthly_installment: float,
+    initial_balance: float,
+    start_date: datetime,
+    calendar: CalendarRule | None = None,
+) -> Schedule:
+    monthly_interest_rate = interest_rate / 12
+    balance = amortize(initial_balance, monthly_interest_rate, monthly_installment)
+    count = len(balance)
+
+    previous = balance[:-1]
+    interest = round_cents(np.abs(previous) * monthly_interest_rate)
+    principal = np.maximum(0.0, monthly_installment - interest)
+    if count > 1 and abs(previous[-1]) + interest[-1] <= monthly_installment:
+        principal[-1] = -previous[-1]
+    installment = round_cents(interest + principal)
+
+    rows = np.zeros(count, dtype=SCHEDULE_DTYPE)
+    rows["month_id"] = np.arange(count)
+    rows["date"] = month_dates(start_date, count, calendar or DEFAULT_CALENDAR)
+    rows["principal"][1:] = round_cents(principal)
+    rows["interest"][1:] = interest
+    rows["installment"][1:] = installment
+    rows["balance"] = balance
+    return Schedule(
+        rows=rows,
+        monthly_interest_rate=monthly_interest_rate,
+        monthly_installment=monthly_installment,
+    )
@@ -0,0 +1,135 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import IO
+
+import numpy as np
+
+from .core import Repayment
+from .engine import SCHEDULE_DTYPE, Schedule, compute_schedule
+
+
+COLUMNS = ("month_id", "date", "principal", "interest", "installment", "balance")
+BUFFER_SIZE = 1 << 20
+
+
+def as_schedule(source: "Schedule | Repayment") -> Schedule:
+    if isinstance(source, Schedule):
+        return source
+    # a python engine or edited schedule lives in the Month chain
+    if source.schedule is not None or source.years:
+        return source.date_index()
+    return compute_schedule(
+        interest_rate=source.interest_rate,
+        monthly_installment=source.monthly_installment,
+        initial_balance=source.initial_balance,
+        start_date=source.start_date,
+        calendar=source.calendar,
+    )
+
+
+def loans(schedules) -> Iterator[tuple[object, Schedule]]:
+    # A single Schedule/Repayment, or (loan_id, Schedule/Repayment) pairs
+    if isinstance(schedules, (Schedule, Repayment)):
+        yield 0, as_schedule(schedules)
+        return
+    if isinstance(schedules, dict):
+        schedules = schedules.items()
+    for loan_id, source in schedules:
+        yield loan_id, as_schedule(source)
+
+
+@contextmanager
+def opened(file, mode: str):
+    if isinstance(file, (str, os.PathLike)):
+        encoding = None if "b" in mode else "utf-8"
+        with open(
+            file, mode, buffering=BUFFER_SIZE, encoding=encoding, newline=""
+        ) as f:
+            yield f
+    else:
+        yield file
+
+
+def text_columns(schedule: Schedule) -> tuple[list, ...]:
+    return (
+        schedule.month_id.tolist(),
+        np.datetime_as_string(schedule.date, unit="D").tolist(),
+        schedule.principal.tolist(),
+        schedule.interest.tolist(),
+        schedule.installment.tolist(),
+        schedule.balance.tolist(),
+    )
+
+
+def loan_id_value(loan_id) -> "int | str":
+    # NumPy integers are written as numbers, any other id as its str()
+    if isinstance(loan_id, (int, np.integer)) and not isinstance(loan_id, bool):
+        return int(loan_id)
+    return str(loan_id)
+
+
+def csv_field(loan_id) -> str:
+    # Quoted like csv.QUOTE_MINIMAL when the id holds a delimiter or quote
+    text = str(loan_id_value(loan_id))
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def write_csv(schedules, file: "str | os.PathLike | IO[str]", header: bool = True):
+    with opened(file, "w") as f:
+        if header:
+            f.write(",".join(("loan_id", *COLUMNS)) + "\n")
+        for loan_id, schedule in loans(schedules):
+            loan = csv_field(loan_id)
+            f.write(
+                "".join(
+                    f"{loan},{month_id},{date},{principal:.2f},{interest:.2f},"
+                    f"{installment:.2f},{balance:.2f}\n"
+                    for month_id, date, principal, interest, installment, balance in zip(
+                        *text_columns(schedule)
+                    )
+                )
+            )
+
+
+def write_jsonl(schedules, file: "str | os.PathLike | IO[str]"):
+    with opened(file, "w") as f:
+        for loan_id, schedule in loans(schedules):
+            loan = f'"loan_id": {json.dumps(loan_id_value(loan_id))}'
+            f.write(
+                "".join(
+                    f'{{{loan}, "month_id": {month_id}, "date": "{date}", '
+                    f'"principal": {principal:.2f}, "interest": {interest:.2f}, '
+                    f'"installment": {installment:.2f}, "balance": {balance:.2f}}}\n'
+                    for month_id, date, principal, interest, installment, balance in zip(
+                        *text_columns(schedule)
+                    )
+                )
+            )
+
+
+def write_npz(schedules, file: "str | os.PathLike | IO[bytes]"):
+    # Columnar dump, one contiguous array per column, read back with np.load
+    loan_ids, rows = [], []
+    for loan_id, schedule in loans(schedules):
+        loan_ids.append(np.full(len(schedule), loan_id))
+        rows.append(schedule.rows)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=SCHEDULE_DTYPE)
+    loan_id = np.concatenate(loan_ids) if loan_ids else np.empty(0, dtype=np.int64)
+    with opened(file, "wb") as f:
+        np.savez(f, loan_id=loan_id, **{column: rows[column] for column in COLUMNS})
+
+
+def read_npz(file) -> dict[str, np.ndarray]:
+    with np.load(file) as data:
+        return {column: data[column] for column in ("loan_id", *COLUMNS)}
+
+
+def export(schedules: Iterable, file, format: str = "csv"):
+    writers = {"csv": write_csv, "jsonl": write_jsonl, "npz": write_npz}
+    if format not in writers:
+        raise ValueError(f"Unknown export format: {format}")
+    writers[format](schedules, file)
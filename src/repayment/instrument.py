@@ -0,0 +1,92 @@
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    parent: str | None = None
+    months: int = 0
+    duration: float = 0.0
+    # Net bytes allocated inside the span, None unless tracemalloc is tracing
+    allocated: int | None = None
+    attributes: dict = field(default_factory=dict)
+    start: float = field(default=0.0, repr=False)
+    memory: int = field(default=0, repr=False)
+
+    def set(self, months: int | None = None, **attributes):
+        if months is not None:
+            self.months = months
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        stack = ACTIVE.__dict__.setdefault("stack", [])
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        if tracemalloc.is_tracing():
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.start
+        if tracemalloc.is_tracing():
+            self.allocated = tracemalloc.get_traced_memory()[0] - self.memory
+        ACTIVE.stack.pop()
+        if exc_info[0] is not None:
+            self.attributes["error"] = exc_info[0].__name__
+        for hook in tuple(HOOKS):
+            hook(self)
+
+
+class NullSpan:
+    # Shared stand-in while no hook is registered, every call is a no-op
+    __slots__ = ()
+
+    def set(self, months: int | None = None, **attributes):
+        pass
+
+    def __enter__(self) -> "NullSpan":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+HOOKS: list[Callable[[Span], None]] = []
+NULL_SPAN = NullSpan()
+ACTIVE = threading.local()
+
+
+def span(name: str, months: int = 0, **attributes) -> "Span | NullSpan":
+    if not HOOKS:
+        return NULL_SPAN
+    return Span(name, months=months, attributes=attributes)
+
+
+def add_hook(hook: Callable[[Span], None], trace_allocations: bool = False):
+    if trace_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    HOOKS.append(hook)
+
+
+def remove_hook(hook: Callable[[Span], None]):
+    HOOKS.remove(hook)
+
+
+@dataclass
+class Recorder:
+    # Collects finished spans, e.g. add_hook(recorder := Recorder())
+    spans: list[Span] = field(default_factory=list)
+
+    def __call__(self, span: Span):
+        self.spans.append(span)
+
+    def totals(self) -> dict[str, float]:
+        totals = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+
+
+MAX_ITERATIONS = 50
+TOLERANCE = 4 * np.finfo(np.float64).eps
+
+
+def irr(cash_flows, guess=0.0) -> np.ndarray:
+    # Newton iterations on the discount factor v = 1 / (1 + r), row-wise for a
+    # 2-D array of cash flows (one loan per row, padded with zeros). Loan cash
+    # flows change sign once, so NPV(v) is monotonic and convex and Newton
+    # converges from the nominal rate in a handful of steps.
+    flows = np.asarray(cash_flows, dtype=np.float64)
+    single = flows.ndim == 1
+    flows = np.atleast_2d(flows)
+    periods = np.arange(flows.shape[1], dtype=np.float64)
+
+    discount = 1.0 / (1.0 + np.broadcast_to(guess, flows.shape[:1]).astype(np.float64))
+    valid = (flows < 0).any(axis=1) & (flows > 0).any(axis=1)
+    pending = np.flatnonzero(valid)
+    for _ in range(MAX_ITERATIONS):
+        if not len(pending):
+            break
+        v = discount[pending]
+        rows = flows[pending]
+        powers = v[:, None] ** periods
+        npv = (rows * powers).sum(axis=1)
+        slope = (rows[:, 1:] * periods[1:] * powers[:, :-1]).sum(axis=1)
+        step = npv / slope
+        next_v = v - step
+        next_v = np.where(next_v > 0, next_v, v / 2)
+        discount[pending] = next_v
+        pending = pending[np.abs(next_v - v) > TOLERANCE * next_v]
+
+    rate = 1.0 / discount - 1.0
+    rate[~valid] = np.nan
+    return rate[0] if single else rate
+
+
+def effective_interest_rate(cash_flows, interest_rate=0.0) -> np.ndarray:
+    return (1 + irr(cash_flows, guess=np.asarray(interest_rate) / 12)) ** 12 - 1
+
+
+def irr_runs(runs, guess=0.0) -> float:
+    # Secant iterations on run-length encoded cash flows, (value, first
+    # period, count) per run, so constant installments cost O(1) per step
+    if not any(value < 0 for value, _, _ in runs) or not any(
+        value > 0 for value, _, _ in runs
+    ):
+        return math.nan
+
+    def npv(rate: float) -> float:
+        log_discount = -math.log1p(rate)
+        total = 0.0
+        for value, first, count in runs:
+            if log_discount == 0:
+                factor = count
+            else:
+                factor = math.expm1(count * log_discount) / math.expm1(log_discount)
+            total += value * math.exp(first * log_discount) * factor
+        return total
+
+    previous, rate = guess, guess + 1e-4
+    previous_npv = npv(previous)
+    for _ in range(MAX_ITERATIONS):
+        rate_npv = npv(rate)
+        if rate_npv == previous_npv:
+            break
+        step = rate_npv * (rate - previous) / (rate_npv - previous_npv)
+        previous, previous_npv = rate, rate_npv
+        rate -= step
+        if abs(rate - previous) <= TOLERANCE * (1 + abs(rate)):
+            break
+    return rate
@@ -1,3 +1,7 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+
 LANGUAGES = {
     "EN": {
         "title": "Repayment Plan",
@@ -12,6 +16,9 @@ LANGUAGES = {
         "principal": "Principal",
         "interest": "Interest",
         "total": "Total",
+        "portfolio": "Portfolio Summary",
+        "installments": "Installments",
+        "payoff_date": "Payoff Date",
     },
     "DE": {
         "title": "Tilgungsplan",
@@ -26,15 +33,78 @@ LANGUAGES = {
         "principal": "Tilgung",
         "interest": "Zinsen",
         "total": "Gesamt",
+        "portfolio": "Portfolioübersicht",
+        "installments": "Raten",
+        "payoff_date": "Letzte Rate",
     },
 }
 
 
-def format_number(value, language="EN"):
-    if language == "DE":
-        formatted_value = (
-            f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        )
-    else:
+CURRENCIES = {
+    "EUR": ("Euro", "EUR", "€"),
+    "USD": ("US Dollar", "USD", "$"),
+    "GBP": ("Pound Sterling", "GBP", "£"),
+    "CHF": ("Swiss Franc", "CHF", "CHF"),
+}
+
+
+@dataclass
+class Locale:
+    code: str
+    decimal_separator: str = "."
+    thousands_separator: str = ","
+    date_format: str = "%Y-%m-%d"
+    table: dict | None = field(init=False, default=None, repr=False)
+
+    def __post_init__(self):
+        # One str.translate pass over Python's "," / "." grouping
+        if (self.thousands_separator, self.decimal_separator) != (",", "."):
+            self.table = str.maketrans(
+                {",": self.thousands_separator, ".": self.decimal_separator}
+            )
+
+    @property
+    def texts(self) -> dict[str, str]:
+        return LANGUAGES[self.code]
+
+    def format_number(self, value) -> str:
         formatted_value = f"{value:,.2f}"
-    return formatted_value
+        if self.table is not None:
+            formatted_value = formatted_value.translate(self.table)
+        return formatted_value
+
+    def format_numbers(self, values) -> list[str]:
+        # Whole column in one translate call
+        joined = "\n".join([f"{value:,.2f}" for value in values])
+        if self.table is not None:
+            joined = joined.translate(self.table)
+        return joined.split("\n") if joined else []
+
+    def format_date(self, date) -> str:
+        return format_date(date, self.code)
+
+
+LOCALES: dict[str, Locale] = {}
+
+
+@lru_cache(maxsize=8192)
+def format_date(date, language="EN") -> str:
+    return date.strftime(LOCALES[language].date_format)
+
+
+def register_locale(locale: Locale, texts: dict[str, str] | None = None) -> Locale:
+    if texts is not None:
+        LANGUAGES[locale.code] = texts
+    LOCALES[locale.code] = locale
+    format_date.cache_clear()
+    return locale
+
+
+register_locale(Locale("EN"))
+register_locale(
+    Locale("DE", decimal_separator=",", thousands_separator=".", date_format="%d.%m.%Y")
+)
+
+
+def format_number(value, language="EN"):
+    return LOCALES.get(language, LOCALES["EN"]).format_number(value)
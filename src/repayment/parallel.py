@@ -0,0 +1,125 @@
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .core import Repayment
+from .report import (
+    DEFAULT_CURRENCY,
+    DEFAULT_FONTS_PATH,
+    DEFAULT_LANGUAGE,
+    PDF,
+    preload_fonts,
+)
+
+
+DEFAULT_FILENAME = "repayment_{index}.pdf"
+
+
+@dataclass
+class RenderResult:
+    index: int
+    filename: str
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def loan_parameters(repayment: Repayment) -> dict:
+    # Workers receive plain parameters, never the (deeply linked) Month chain.
+    # An existing schedule (segments, what-if edits) travels packed, workers
+    # only compute one when there is none.
+    schedule = None
+    if repayment.schedule is not None or repayment.years:
+        schedule = repayment.date_index()
+    return {
+        "interest_rate": repayment.interest_rate,
+        "monthly_installment": repayment.monthly_installment,
+        "initial_balance": repayment.initial_balance,
+        "start_date": repayment.start_date,
+        "max_interest_installment_ratio": repayment.max_interest_installment_ratio,
+        "effective_interest_rate": repayment.effective_interest_rate,
+        "schedule": schedule,
+        "calendar": repayment.calendar,
+    }
+
+
+def init_worker(fonts_path: str):
+    preload_fonts(fonts_path)
+
+
+def render(
+    index: int,
+    loan: dict,
+    filename: str,
+    language: str,
+    currency: tuple[str, ...],
+    fonts_path: str,
+    engine: str,
+) -> RenderResult:
+    try:
+        repayment = Repayment(**loan)
+        if repayment.schedule is None:
+            repayment.generate_schedule(engine=engine)
+        PDF.generate_repayment(
+            repayment,
+            filename,
+            language=language,
+            currency=currency,
+            fonts_path=fonts_path,
+        )
+    except Exception as error:
+        return RenderResult(index, filename, f"{type(error).__name__}: {error}")
+    return RenderResult(index, filename)
+
+
+def collect(index: int, filename: str, future: Future) -> RenderResult:
+    try:
+        return future.result()
+    except Exception as error:
+        return RenderResult(index, filename, f"{type(error).__name__}: {error}")
+
+
+def generate_many(
+    repayments: Iterable[Repayment],
+    out_dir: str,
+    workers: int | None = None,
+    language=DEFAULT_LANGUAGE,
+    currency=DEFAULT_CURRENCY,
+    fonts_path=DEFAULT_FONTS_PATH,
+    filename=DEFAULT_FILENAME,
+    max_pending: int | None = None,
+    engine: str = "numpy",
+) -> Iterator[RenderResult]:
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(fonts_path,)
+    )
+    pending = deque()
+    try:
+        for index, repayment in enumerate(repayments):
+            if len(pending) >= max_pending:
+                yield collect(*pending.popleft())
+            path = str(Path(out_dir) / filename.format(index=index))
+            future = pool.submit(
+                render,
+                index,
+                loan_parameters(repayment),
+                path,
+                language,
+                currency,
+                fonts_path,
+                engine,
+            )
+            pending.append((index, path, future))
+        while pending:
+            yield collect(*pending.popleft())
+    finally:
+        pool.shutdown(cancel_futures=True)
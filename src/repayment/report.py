@@ -1,8 +1,22 @@
+import copy
+import math
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO
+
 from fpdf import FPDF, XPos, YPos
+from fpdf.fonts import SubsetMap, TTFFont
+from fontTools import ttLib
 from datetime import datetime
 
-from .core import Repayment
-from .lang import LANGUAGES, format_number
+from .core import Repayment, ScheduleRow
+from .instrument import span
+from .lang import CURRENCIES, LOCALES, format_date
+
+if TYPE_CHECKING:
+    from .batch import BatchResult
 
 
 FONT_FAMILY = "Roboto"
@@ -20,9 +34,41 @@ MARGIN_RIGHT = 10
 MARGIN_TOP = 10
 MARGIN_BOTTOM = 10
 TB_BORDER = 0
-DEFAULT_CURRENCY = ("Euro", "EUR", "€")
+DEFAULT_CURRENCY = CURRENCIES["EUR"]
 DEFAULT_LANGUAGE = "EN"
-DEFAULT_FONTS_PATH="fonts"
+DEFAULT_FONTS_PATH = "fonts"
+FONT_FILES = {"": "Roboto-Regular.ttf", "B": "Roboto-Bold.ttf"}
+
+# Parsed fonts per (fonts_path, style), shared by all PDF instances of a process
+FONT_CACHE: dict[tuple[str, str], TTFFont] = {}
+FONT_CACHE_LOCK = threading.Lock()
+
+
+def preload_fonts(fonts_path: str = DEFAULT_FONTS_PATH) -> None:
+    # Parses the bundled fonts once per process, e.g. in a worker initializer
+    with FONT_CACHE_LOCK:
+        for style, file_name in FONT_FILES.items():
+            if (fonts_path, style) not in FONT_CACHE:
+                pdf = FPDF()
+                pdf.add_font(FONT_FAMILY, style, f"{fonts_path}/{file_name}")
+                fontkey = f"{FONT_FAMILY.lower()}{style}"
+                FONT_CACHE[(fonts_path, style)] = pdf.fonts[fontkey]
+
+
+def clear_font_cache() -> None:
+    with FONT_CACHE_LOCK:
+        for font in FONT_CACHE.values():
+            font.close()
+        FONT_CACHE.clear()
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    # Header labels and column widths, computed once per document and
+    # reused by every table of that kind
+    headers: tuple[str, ...]
+    widths: tuple[float, ...]
+
 
 class PDF(FPDF):
     def __init__(self, language: str, fonts_path: str, currency: tuple[str, ...]):
@@ -30,15 +76,44 @@ class PDF(FPDF):
         self.set_auto_page_break(auto=True, margin=MARGIN_BOTTOM)
         self.set_margins(MARGIN_LEFT, MARGIN_TOP, MARGIN_RIGHT)
         self.language = language
-        self.texts = LANGUAGES[self.language]
+        self.locale = LOCALES[self.language]
+        self.texts = self.locale.texts
         self.currency = currency[0]
         self.currency_sign = currency[-1]
 
-        self.add_font(FONT_FAMILY, "", f"{fonts_path}/Roboto-Regular.ttf")
-        self.add_font(FONT_FAMILY, "B", f"{fonts_path}/Roboto-Bold.ttf")
+        preload_fonts(fonts_path)
+        for style in FONT_FILES:
+            self.add_cached_font(FONT_CACHE[(fonts_path, style)])
+
+        columns = ("id", "date", "balance", "principal", "interest", "installment")
+        self.year_layout = TableLayout(
+            headers=tuple(self.texts[key] for key in columns),
+            widths=(HEADER_CELL_WIDTH // 3, *[HEADER_CELL_WIDTH] * 5),
+        )
+
+    def add_cached_font(self, cached: TTFFont):
+        # Metrics and glyph tables are shared, the font file handle and the
+        # glyph subset are per document because output() subsets in place
+        font = copy.copy(cached)
+        font.i = len(self.fonts) + 1
+        font.ttfont = ttLib.TTFont(
+            font.ttffile, recalcTimestamp=False, fontNumber=0, lazy=True
+        )
+        font.missing_glyphs = []
+        reserved = "\x00 \r\n"
+        if self.str_alias_nb_pages:
+            reserved += "0123456789" + self.str_alias_nb_pages
+        font.subset = SubsetMap(font, [ord(char) for char in reserved])
+        self.fonts[font.fontkey] = font
 
     def format_number(self, value) -> str:
-        return format_number(value, self.language)
+        return self.locale.format_number(value)
+
+    def table_header(self, layout: TableLayout):
+        self.set_font(FONT_FAMILY, "B", FONT_SIZE_BODY)
+        for header, width in zip(layout.headers, layout.widths):
+            self.cell(width, CELL_HEIGHT, header, TB_BORDER, align="R")
+        self.ln()
 
     def chapter_title(self, title):
         self.set_font(FONT_FAMILY, "B", FONT_SIZE_TITLE)
@@ -162,13 +237,14 @@ class PDF(FPDF):
         interest_rate: float,
         interest_rate_effective: float,
         next_installment: float,
+        title: str | None = None,
     ):
         self.add_page()
         self.set_font(FONT_FAMILY, "B", FONT_SIZE_TITLE * 1.5)
         self.cell(
             0,
             CELL_HEIGHT_OVERVIEW,
-            self.texts["title"],
+            title or self.texts["title"],
             new_x=XPos.LMARGIN,
             new_y=YPos.NEXT,
             align="L",
@@ -185,11 +261,7 @@ class PDF(FPDF):
             self.texts["installment"],
         ]
         values = [
-            (
-                start_date.strftime("%Y-%m-%d")
-                if self.language == "EN"
-                else start_date.strftime("%d.%m.%Y")
-            ),
+            self.format_date(start_date),
             f"{self.format_number(abs(initial_balance))} {self.currency}",
             f"{self.format_number(interest_rate * 100)} %",
             f"{self.format_number(interest_rate_effective * 100)} %",
@@ -221,103 +293,85 @@ class PDF(FPDF):
 
     def chapter_body(self, data):
         self.set_font(FONT_FAMILY, "", FONT_SIZE_BODY)
-        for row in data:
+        balances, principals, interests, installments = (
+            self.locale.format_numbers([row[column] for row in data])
+            for column in (4, 1, 2, 3)
+        )
+        for row, *values in zip(data, balances, principals, interests, installments):
             self.cell(
                 HEADER_CELL_WIDTH // 3, CELL_HEIGHT, str(row[0]), TB_BORDER, align="R"
             )
             self.cell(HEADER_CELL_WIDTH, CELL_HEIGHT, str(row[5]), TB_BORDER, align="R")
-            self.cell(
-                HEADER_CELL_WIDTH,
-                CELL_HEIGHT,
-                f"{self.format_number(row[4])} {self.currency_sign}",
-                TB_BORDER,
-                align="R",
-            )
-            self.cell(
-                HEADER_CELL_WIDTH,
-                CELL_HEIGHT,
-                f"{self.format_number(row[1])} {self.currency_sign}",
-                TB_BORDER,
-                align="R",
-            )
-            self.cell(
-                HEADER_CELL_WIDTH,
-                CELL_HEIGHT,
-                f"{self.format_number(row[2])} {self.currency_sign}",
-                TB_BORDER,
-                align="R",
-            )
-            self.cell(
-                HEADER_CELL_WIDTH,
-                CELL_HEIGHT,
-                f"{self.format_number(row[3]):} {self.currency_sign}",
-                TB_BORDER,
-                align="R",
-            )
+            for value in values:
+                self.cell(
+                    HEADER_CELL_WIDTH,
+                    CELL_HEIGHT,
+                    f"{value} {self.currency_sign}",
+                    TB_BORDER,
+                    align="R",
+                )
             self.ln()
         self.ln(SPACING_SMALL)
 
+    def format_date(self, date: datetime) -> str:
+        return format_date(date, self.language)
+
+    @staticmethod
+    def table_height(num_rows: int, num_quarters: int) -> float:
+        return (
+            (num_rows + num_quarters) * CELL_HEIGHT
+            + SPACING_SMALL * num_quarters
+            + SPACING_MEDIUM
+        )
+
+    def year_table(
+        self,
+        year: int,
+        quarters: list,
+        year_total,
+        required_height: float | None = None,
+    ):
+        # quarters: (body rows, quarter total) pairs as taken by chapter_body
+        # and chapter_total, year_total as taken by chapter_year_total
+        if required_height is None:
+            required_height = self.table_height(
+                sum(len(data) for data, _ in quarters), len(quarters)
+            )
+
+        if self.get_y() + required_height * 1.2 > self.h - MARGIN_BOTTOM:
+            self.add_page()
+
+        self.chapter_title(f"{year}")
+        self.table_header(self.year_layout)
+
+        for data, quarter_total in quarters:
+            self.chapter_body(data)
+            self.chapter_total(quarter_total)
+
+        self.chapter_year_total(year_total)
+        self.ln(SPACING_LARGE)
+
     @staticmethod
     def generate_repayment(
         repayment_schedule: Repayment,
         filename: str,
         language=DEFAULT_LANGUAGE,
         currency=DEFAULT_CURRENCY,
-        fonts_path=DEFAULT_FONTS_PATH
+        fonts_path=DEFAULT_FONTS_PATH,
     ) -> None:
 
-        pdf = PDF(language=language, fonts_path=fonts_path, currency=currency)
-        pdf.overview(
-            start_date=repayment_schedule.start_date,
-            initial_balance=repayment_schedule.initial_balance,
-            interest_rate=repayment_schedule.interest_rate,
-            interest_rate_effective=repayment_schedule.effective_interest_rate,
-            next_installment=repayment_schedule.monthly_installment,
-        )
-        total_principal = 0.0
-        total_interest = 0.0
-        total_installment = 0.0
-        for year in repayment_schedule.years:
-            num_rows = sum(len(quarter.month_list) for quarter in year.quarter_list)
-            required_height = (
-                (num_rows + len(year.quarter_list)) * CELL_HEIGHT
-                + SPACING_SMALL * len(year.quarter_list)
-                + SPACING_MEDIUM
+        with span("pdf.overview"):
+            pdf = PDF(language=language, fonts_path=fonts_path, currency=currency)
+            pdf.overview(
+                start_date=repayment_schedule.start_date,
+                initial_balance=repayment_schedule.initial_balance,
+                interest_rate=repayment_schedule.interest_rate,
+                interest_rate_effective=repayment_schedule.effective_interest_rate,
+                next_installment=repayment_schedule.monthly_installment,
             )
-
-            if pdf.get_y() + required_height * 1.2 > pdf.h - MARGIN_BOTTOM:
-                pdf.add_page()
-
-            year_title = f"{year.year}"
-            pdf.chapter_title(year_title)
-
-            headers = [
-                pdf.texts["id"],
-                pdf.texts["date"],
-                pdf.texts["balance"],
-                pdf.texts["principal"],
-                pdf.texts["interest"],
-                pdf.texts["installment"],
-            ]
-            pdf.set_font(FONT_FAMILY, "B", FONT_SIZE_BODY)
-            for header in headers:
-                pdf.cell(
-                    (
-                        HEADER_CELL_WIDTH // 3
-                        if header == headers[0]
-                        else HEADER_CELL_WIDTH
-                    ),
-                    CELL_HEIGHT,
-                    header,
-                    TB_BORDER,
-                    align="R",
-                )
-            pdf.ln()
-
-            year_principal = 0.0
-            year_interest = 0.0
-            year_installment = 0.0
-
+        # Quarter, year and final totals come from the cached rollups
+        for year in repayment_schedule.years:
+            quarters = []
             for quarter in year.quarter_list:
                 data = []
                 for month in quarter.month_list:
@@ -328,31 +382,268 @@ class PDF(FPDF):
                             month.tr.interest,
                             month.tr.installment,
                             month.balance,
-                            (
-                                month.date.strftime("%Y-%m-%d")
-                                if language == "EN"
-                                else month.date.strftime("%d.%m.%Y")
-                            ),
+                            pdf.format_date(month.date),
                         ]
                     )
-                pdf.chapter_body(data)
 
-                quarter_pivot = quarter.pivot()
-                total_principal += quarter_pivot[1]
-                total_interest += quarter_pivot[2]
-                total_installment += quarter_pivot[3]
+                quarters.append((data, [*quarter.pivot(), month.balance]))
 
-                year_principal += quarter_pivot[1]
-                year_interest += quarter_pivot[2]
-                year_installment += quarter_pivot[3]
+            year_total = (0, *year.pivot()[1:])
+            with span("pdf.year", year=year.year) as year_span:
+                pdf.year_table(year.year, quarters, [*year_total, month.balance])
+                year_span.set(months=sum(len(data) for data, _ in quarters))
 
-                pdf.chapter_total([*quarter_pivot, month.balance])
+        final_total = (0, *repayment_schedule.pivot()[1:])
+        pdf.final_total([*final_total, month.balance])
 
-            year_total = (0, year_principal, year_interest, year_installment)
-            pdf.chapter_year_total([*year_total, month.balance])
-            pdf.ln(SPACING_LARGE)
+        with span("pdf.output", pages=pdf.page_no()):
+            pdf.output(filename)
 
-        final_total = (0, total_principal, total_interest, total_installment)
-        pdf.final_total([*final_total, month.balance])
+    @staticmethod
+    def stream_repayment(
+        repayment_schedule: Repayment,
+        output: "str | os.PathLike | BinaryIO",
+        language=DEFAULT_LANGUAGE,
+        currency=DEFAULT_CURRENCY,
+        fonts_path=DEFAULT_FONTS_PATH,
+    ) -> None:
+        # Renders from Repayment.iter_schedule(): only the rows of the current
+        # year are held, no Month/Year objects are built. The document itself
+        # is not streamed, fpdf2 keeps every finished page until write_output.
+        if repayment_schedule.effective_interest_rate is None:
+            for _ in repayment_schedule.iter_schedule():
+                pass
+
+        with span("pdf.overview"):
+            pdf = PDF(language=language, fonts_path=fonts_path, currency=currency)
+            pdf.overview(
+                start_date=repayment_schedule.start_date,
+                initial_balance=repayment_schedule.initial_balance,
+                interest_rate=repayment_schedule.interest_rate,
+                interest_rate_effective=repayment_schedule.effective_interest_rate,
+                next_installment=repayment_schedule.monthly_installment,
+            )
+        pdf.schedule_tables(repayment_schedule.iter_schedule())
+
+        with span("pdf.output", pages=pdf.page_no()):
+            pdf.write_output(output)
+
+    @staticmethod
+    def generate_consolidated(
+        repayments: list[Repayment],
+        output: "str | os.PathLike | BinaryIO",
+        language=DEFAULT_LANGUAGE,
+        currency=DEFAULT_CURRENCY,
+        fonts_path=DEFAULT_FONTS_PATH,
+    ) -> None:
+        # One statement for several loans: a portfolio page, then each loan as
+        # stream_repayment renders it. Every loan is amortized once, or not at
+        # all when it has a schedule; the portfolio totals, the effective
+        # rates and the year tables are all taken from those schedules.
+        from .batch import summarize_schedules
+        from .core import with_subtotals
+        from .export import as_schedule
+
+        if not repayments:
+            raise ValueError("No repayments to report")
+
+        with span("pdf.portfolio", loans=len(repayments)):
+            schedules = [as_schedule(repayment) for repayment in repayments]
+            result = summarize_schedules(
+                schedules,
+                interest_rate=[repayment.interest_rate for repayment in repayments],
+                monthly_installment=[
+                    repayment.monthly_installment for repayment in repayments
+                ],
+                initial_balance=[repayment.initial_balance for repayment in repayments],
+            )
+            pdf = PDF(language=language, fonts_path=fonts_path, currency=currency)
+            pdf.portfolio(repayments, result)
+
+        rates = result.effective_interest_rate.tolist()
+        for number, (repayment, schedule, rate) in enumerate(
+            zip(repayments, schedules, rates), start=1
+        ):
+            with span("pdf.overview"):
+                pdf.overview(
+                    start_date=repayment.start_date,
+                    initial_balance=repayment.initial_balance,
+                    interest_rate=repayment.interest_rate,
+                    interest_rate_effective=rate,
+                    next_installment=repayment.monthly_installment,
+                    title=f"{pdf.texts['title']} #{number}",
+                )
+            # page breaks from the row counts of the schedule
+            heights = {
+                year: pdf.table_height(months, quarters)
+                for year, months, quarters in zip(*schedule.period_counts())
+            }
+            pdf.schedule_tables(with_subtotals(schedule.iter_rows()), heights)
+
+        with span("pdf.output", pages=pdf.page_no()):
+            pdf.write_output(output)
+
+    def schedule_tables(
+        self, rows: Iterable[ScheduleRow], heights: dict[int, float] | None = None
+    ):
+        # Year tables and the final total from rows as Repayment.iter_schedule()
+        # yields them, heights holds the precomputed height of each year table
+        quarters = []
+        data = []
+        for row in rows:
+            values = [row.principal, row.interest, row.installment, row.balance]
+            if row.kind == "month":
+                data.append(
+                    [
+                        row.month_id,
+                        row.principal,
+                        row.interest,
+                        row.installment,
+                        row.balance,
+                        self.format_date(row.date),
+                    ]
+                )
+            elif row.kind == "quarter":
+                quarters.append((data, [row.month_id, *values]))
+                data = []
+            elif row.kind == "year":
+                year = row.date.year
+                with span("pdf.year", year=year) as year_span:
+                    self.year_table(
+                        year,
+                        quarters,
+                        [0, *values],
+                        None if heights is None else heights[year],
+                    )
+                    year_span.set(months=sum(len(data) for data, _ in quarters))
+                quarters = []
+            else:
+                self.final_total([0, *values])
+
+    def portfolio_rows(
+        self, repayments: list[Repayment], result: "BatchResult"
+    ) -> list[tuple[str, ...]]:
+        # Cell texts of the portfolio table, the last row holds the totals
+        numbers = {
+            "loan_amount": [abs(round(loan.initial_balance, 2)) for loan in repayments],
+            "interest_rate": [loan.interest_rate * 100 for loan in repayments],
+            "installment": result.monthly_installment.tolist(),
+            "interest": result.total_interest.tolist(),
+            "total": result.total_installment.tolist(),
+        }
+        totals = {
+            key: round(math.fsum(numbers[key]), 2)
+            for key in ("loan_amount", "interest", "total")
+        }
+        formatted = {
+            key: self.locale.format_numbers([*values, totals.get(key, 0.0)])
+            for key, values in numbers.items()
+        }
+        payoff_dates = result.payoff_date.astype("datetime64[us]").tolist()
+        rows = []
+        for index, repayment in enumerate(repayments):
+            rows.append(
+                (
+                    f"#{index + 1}",
+                    f"{formatted['loan_amount'][index]} {self.currency}",
+                    f"{formatted['interest_rate'][index]} %",
+                    f"{formatted['installment'][index]} {self.currency}",
+                    str(int(result.term[index])),
+                    f"{formatted['interest'][index]} {self.currency}",
+                    f"{formatted['total'][index]} {self.currency}",
+                    self.format_date(payoff_dates[index]),
+                )
+            )
+        rows.append(
+            (
+                self.texts["total"],
+                f"{formatted['loan_amount'][-1]} {self.currency}",
+                "",
+                "",
+                str(int(result.term.sum())),
+                f"{formatted['interest'][-1]} {self.currency}",
+                f"{formatted['total'][-1]} {self.currency}",
+                self.format_date(max(payoff_dates)),
+            )
+        )
+        return rows
+
+    def portfolio_layout(self, rows: list[tuple[str, ...]]) -> TableLayout:
+        # Each column is as wide as its widest cell, measured once
+        headers = tuple(
+            self.texts[key]
+            for key in (
+                "id",
+                "loan_amount",
+                "interest_rate",
+                "installment",
+                "installments",
+                "interest",
+                "total",
+                "payoff_date",
+            )
+        )
+        self.set_font(FONT_FAMILY, "B", FONT_SIZE_BODY)
+        widths = [self.get_string_width(header) for header in headers]
+        for row in rows:
+            for column, text in enumerate(row):
+                widths[column] = max(widths[column], self.get_string_width(text))
+        return TableLayout(
+            headers=headers,
+            widths=tuple(width + 2 * self.c_margin for width in widths),
+        )
+
+    def portfolio(self, repayments: list[Repayment], result: "BatchResult"):
+        self.add_page()
+        self.set_font(FONT_FAMILY, "B", FONT_SIZE_TITLE * 1.5)
+        self.cell(
+            0,
+            CELL_HEIGHT_OVERVIEW,
+            self.texts["portfolio"],
+            new_x=XPos.LMARGIN,
+            new_y=YPos.NEXT,
+            align="L",
+        )
+        self.ln(SPACING_MEDIUM)
+
+        *rows, total = self.portfolio_rows(repayments, result)
+        layout = self.portfolio_layout([*rows, total])
+        # Page breaks from the row counts: every page repeats the header, the
+        # totals below the last row take the space of two rows
+        bottom = self.h - MARGIN_BOTTOM - CELL_HEIGHT
+        capacity = int((bottom - self.get_y()) // CELL_HEIGHT)
+        per_page = int((bottom - MARGIN_TOP) // CELL_HEIGHT)
+        pages = [[]]
+        for row in rows:
+            if len(pages[-1]) == capacity:
+                pages.append([])
+                capacity = per_page
+            pages[-1].append(row)
+        if len(pages[-1]) + 2 > capacity:
+            pages.append([])
+
+        for page_number, page in enumerate(pages):
+            if page_number:
+                self.add_page()
+            self.table_header(layout)
+            self.set_font(FONT_FAMILY, "", FONT_SIZE_BODY)
+            for row in page:
+                for text, width in zip(row, layout.widths):
+                    self.cell(width, CELL_HEIGHT, text, TB_BORDER, align="R")
+                self.ln()
+
+        self.ln(SPACING_SMALL)
+        right = MARGIN_LEFT + sum(layout.widths)
+        self.line(MARGIN_LEFT, self.get_y(), right, self.get_y())
+        self.ln(SPACING_SMALL)
+        self.set_font(FONT_FAMILY, "B", FONT_SIZE_BODY)
+        for text, width in zip(total, layout.widths):
+            self.cell(width, CELL_HEIGHT, text, TB_BORDER, align="R")
+        self.ln()
 
-        pdf.output(filename)
+    def write_output(self, output: "str | os.PathLike | BinaryIO"):
+        # fpdf2 assembles the whole document in memory before it is written
+        if isinstance(output, (str, os.PathLike)):
+            self.output(output)
+        else:
+            output.write(self.output())
@@ -0,0 +1,192 @@
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+from .calendars import DEFAULT_CALENDAR, CalendarRule
+from .core import Repayment
+from .engine import SCHEDULE_DTYPE, Schedule, amortize, round_cents
+
+
+@dataclass(frozen=True)
+class Reset:
+    # New terms from the first payment on or after `date`; None keeps the
+    # previous rate/installment, extra_payment is paid once in that month
+    date: datetime
+    interest_rate: float | None = None
+    monthly_installment: float | None = None
+    extra_payment: float = 0.0
+
+
+@dataclass
+class Segment:
+    # None terms are taken from the preceding segment when evaluated
+    month_id: int
+    interest_rate: float | None
+    monthly_installment: float | None
+    extra_payment: float = 0.0
+    rows: np.ndarray | None = field(default=None, repr=False)
+
+
+def segment_rows(
+    month_id: int,
+    balance: float,
+    interest_rate: float,
+    installment: float,
+    extra_payment: float,
+    count: int | None,
+) -> np.ndarray:
+    # One segment in bulk: only the balance recursion is sequential
+    rate = interest_rate / 12
+    balances = amortize(balance, rate, installment, extra_payment, count)
+    previous = balances[:-1]
+    payments = np.full(len(previous), installment, dtype=np.float64)
+    payments[:1] += extra_payment
+    interest = round_cents(np.abs(previous) * rate)
+    principal = np.maximum(0.0, payments - interest)
+    if len(previous) and balances[-1] == 0:
+        principal[-1] = -previous[-1]
+
+    rows = np.zeros(len(previous), dtype=SCHEDULE_DTYPE)
+    rows["month_id"] = np.arange(month_id, month_id + len(previous))
+    rows["principal"] = round_cents(principal)
+    rows["interest"] = interest
+    rows["installment"] = round_cents(interest + principal)
+    rows["balance"] = balances[1:]
+    return rows
+
+
+@dataclass
+class SegmentedLoan:
+    interest_rate: float
+    monthly_installment: float
+    initial_balance: float
+    start_date: datetime
+    calendar: CalendarRule = DEFAULT_CALENDAR
+    # Reset index: month ids of the segment starts (1 for the initial terms,
+    # month 0 is the start row) and the segments, both sorted by month id
+    starts: list[int] = field(default_factory=list, init=False, repr=False)
+    segments: list[Segment] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        self.starts = [1]
+        self.segments = [Segment(1, None, None)]
+
+    def month_of(self, date: datetime) -> int:
+        # First payment month on or after date, month 0 is not a payment
+        months = (
+            (date.year - self.start_date.year) * 12 + date.month - self.start_date.month
+        )
+        dates = self.calendar.dates(
+            np.datetime64(self.start_date, "us"), np.arange(max(months, 0) + 2)
+        )
+        return max(int(np.searchsorted(dates, np.datetime64(date, "us"))), 1)
+
+    def segment_at(self, month_id: int) -> Segment:
+        return self.segments[bisect_right(self.starts, month_id) - 1]
+
+    def invalidate(self, position: int):
+        # Segments before `position` keep their rows, the rest depend on the
+        # balance handed over and are evaluated again
+        for segment in self.segments[position:]:
+            segment.rows = None
+
+    def add_reset(self, reset: Reset) -> Segment:
+        month_id = self.month_of(reset.date)
+        position = bisect_left(self.starts, month_id)
+        if position < len(self.starts) and self.starts[position] == month_id:
+            # resets in the same month combine: new terms replace the ones
+            # they set, special repayments add up
+            segment = self.segments[position]
+            if reset.interest_rate is not None:
+                segment.interest_rate = reset.interest_rate
+            if reset.monthly_installment is not None:
+                segment.monthly_installment = reset.monthly_installment
+            segment.extra_payment += reset.extra_payment
+            self.invalidate(position)
+        else:
+            # the segment that is split ends earlier now
+            segment = Segment(
+                month_id,
+                reset.interest_rate,
+                reset.monthly_installment,
+                reset.extra_payment,
+            )
+            self.starts.insert(position, month_id)
+            self.segments.insert(position, segment)
+            self.invalidate(position - 1)
+        return segment
+
+    def remove_reset(self, date: datetime):
+        month_id = self.month_of(date)
+        position = bisect_left(self.starts, month_id)
+        if position == len(self.starts) or self.starts[position] != month_id:
+            raise ValueError(f"No reset at {date}")
+        if not position:
+            # the first segment always exists, it falls back to the initial terms
+            self.segments[0] = Segment(1, None, None)
+            self.invalidate(0)
+            return
+        del self.starts[position]
+        del self.segments[position]
+        self.invalidate(position - 1)
+
+    def evaluate(self) -> list[np.ndarray]:
+        balance = round(self.initial_balance, 2)
+        parts = [np.array([(0, 0, 0.0, 0.0, 0.0, balance)], dtype=SCHEDULE_DTYPE)]
+        rate, installment = self.interest_rate, self.monthly_installment
+        for position, segment in enumerate(self.segments):
+            if balance == 0:
+                break
+            if segment.interest_rate is not None:
+                rate = segment.interest_rate
+            if segment.monthly_installment is not None:
+                installment = segment.monthly_installment
+            if segment.rows is None:
+                end = (
+                    self.starts[position + 1]
+                    if position + 1 < len(self.starts)
+                    else None
+                )
+                segment.rows = segment_rows(
+                    segment.month_id,
+                    balance,
+                    rate,
+                    installment,
+                    segment.extra_payment,
+                    None if end is None else end - segment.month_id,
+                )
+            parts.append(segment.rows)
+            if len(segment.rows):
+                balance = float(segment.rows["balance"][-1])
+        return parts
+
+    def schedule(self) -> Schedule:
+        rows = np.concatenate(self.evaluate())
+        rows["date"] = self.calendar.dates(
+            np.datetime64(self.start_date, "us"), rows["month_id"].astype(np.int64)
+        )
+        return Schedule(
+            rows=rows,
+            monthly_interest_rate=self.interest_rate / 12,
+            monthly_installment=self.monthly_installment,
+        )
+
+    def repayment(self) -> Repayment:
+        # A Repayment around the segmented schedule for reports and exports,
+        # the installment is not clamped since the segments define it
+        repayment = Repayment(
+            interest_rate=self.interest_rate,
+            monthly_installment=self.monthly_installment,
+            initial_balance=self.initial_balance,
+            start_date=self.start_date,
+            max_interest_installment_ratio=math.inf,
+            calendar=self.calendar,
+        )
+        repayment.schedule = self.schedule()
+        repayment.effective_interest_rate = (
+            repayment.calculate_effective_interest_rate()
+        )
+        return repayment
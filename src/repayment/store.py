@@ -0,0 +1,147 @@
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .core import Repayment
+from .engine import SCHEDULE_DTYPE, Schedule
+from .export import loans
+
+
+VERSION = 1
+ROWS_FILE = "rows.bin"
+INDEX_FILE = "index.bin"
+META_FILE = "store.json"
+INDEX_DTYPE = np.dtype(
+    [
+        ("loan_id", np.int64),
+        ("offset", np.int64),
+        ("count", np.int64),
+        ("monthly_interest_rate", np.float64),
+        ("monthly_installment", np.float64),
+    ]
+)
+
+
+def mapped(path: str, dtype: np.dtype) -> np.ndarray:
+    # np.memmap refuses empty files; the plain ndarray view keeps the mapping
+    # alive and slices without the memmap subclass overhead
+    if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+        return np.empty(0, dtype=dtype)
+    count = os.path.getsize(path) // dtype.itemsize
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,)).view(np.ndarray)
+
+
+def truncate_partial(f, dtype: np.dtype) -> int:
+    # Drops a partial record left by an interrupted write, returns the
+    # number of complete records
+    size = f.seek(0, os.SEEK_END)
+    count, partial = divmod(size, dtype.itemsize)
+    if partial:
+        f.truncate(size - partial)
+        f.seek(0, os.SEEK_END)
+    return count
+
+
+@dataclass
+class ScheduleStore:
+    # A directory with fixed-width SCHEDULE_DTYPE records of all loans
+    # (rows.bin) and one INDEX_DTYPE entry per loan (index.bin). Both are
+    # append-only and memory-mapped read-only, get() returns a view.
+    path: str
+    rows: np.ndarray = field(init=False, repr=False)
+    index: np.ndarray = field(init=False, repr=False)
+    order: np.ndarray | None = field(default=None, init=False, repr=False)
+    sorted_ids: np.ndarray | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, META_FILE)
+        meta = {
+            "version": VERSION,
+            "rows": SCHEDULE_DTYPE.descr,
+            "index": INDEX_DTYPE.descr,
+        }
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                stored = json.load(f)
+            if stored != json.loads(json.dumps(meta)):
+                raise ValueError(f"Incompatible schedule store: {self.path}")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+        self.refresh()
+
+    def refresh(self):
+        # Maps the files again, e.g. after another process appended loans
+        self.rows = mapped(os.path.join(self.path, ROWS_FILE), SCHEDULE_DTYPE)
+        self.index = mapped(os.path.join(self.path, INDEX_FILE), INDEX_DTYPE)
+        self.order = None
+        self.sorted_ids = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, loan_id: int) -> bool:
+        return self.position(loan_id) is not None
+
+    def loan_ids(self) -> np.ndarray:
+        return self.index["loan_id"]
+
+    def position(self, loan_id: int) -> int | None:
+        # Binary search over the loan ids, sorted once per refresh
+        if self.order is None:
+            self.order = np.argsort(self.index["loan_id"], kind="stable")
+            self.sorted_ids = self.index["loan_id"][self.order]
+        ids = self.sorted_ids
+        found = int(np.searchsorted(ids, loan_id))
+        if found < len(ids) and ids[found] == loan_id:
+            return int(self.order[found])
+        return None
+
+    def get(self, loan_id: int) -> Schedule:
+        position = self.position(loan_id)
+        if position is None:
+            raise KeyError(loan_id)
+        entry = self.index[position]
+        offset, count = int(entry["offset"]), int(entry["count"])
+        return Schedule(
+            rows=self.rows[offset : offset + count],
+            monthly_interest_rate=float(entry["monthly_interest_rate"]),
+            monthly_installment=float(entry["monthly_installment"]),
+        )
+
+    def append(self, loan_id: int, schedule: "Schedule | Repayment"):
+        self.extend([(loan_id, schedule)])
+
+    def extend(self, schedules: Iterable):
+        # Rows are written before the index entries, so an interrupted append
+        # leaves unreferenced rows at worst, never a dangling index entry
+        items = list(loans(schedules))
+        seen = set()
+        for loan_id, _ in items:
+            if loan_id in seen or loan_id in self:
+                raise ValueError(f"Loan {loan_id} is already stored")
+            seen.add(loan_id)
+        entries = []
+        with open(os.path.join(self.path, ROWS_FILE), "ab") as f:
+            offset = truncate_partial(f, SCHEDULE_DTYPE)
+            for loan_id, schedule in items:
+                rows = np.ascontiguousarray(schedule.rows, dtype=SCHEDULE_DTYPE)
+                f.write(rows.tobytes())
+                entries.append(
+                    (
+                        loan_id,
+                        offset,
+                        len(rows),
+                        schedule.monthly_interest_rate,
+                        schedule.monthly_installment,
+                    )
+                )
+                offset += len(rows)
+        with open(os.path.join(self.path, INDEX_FILE), "ab") as f:
+            truncate_partial(f, INDEX_DTYPE)
+            f.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+        self.refresh()